@@ -0,0 +1,78 @@
+# uv run bench_history.py --items 10000
+"""Time and peak memory per handoff for the SDK's filters vs history views.
+
+The history is synthetic: user and assistant messages with function calls and
+outputs in between, like a long multi-hop conversation. Each case filters it the
+way the runner does on a handoff and then materializes the result with `list()`,
+because that is what the runner hands to the next agent.
+"""
+import argparse
+import tracemalloc
+from time import perf_counter
+
+from agents import HandoffInputData
+from agents.extensions import handoff_filters
+
+import history_view
+
+
+def synthetic_history(items: int) -> tuple[dict, ...]:
+    history = []
+    i = 0
+    while len(history) < items:
+        history.append({"role": "user", "content": f"question {i}"})
+        history.append({"type": "function_call", "call_id": f"c{i}", "name": "get_weather", "arguments": "{}"})
+        history.append({"type": "function_call_output", "call_id": f"c{i}", "output": "20 degrees"})
+        history.append({"role": "assistant", "content": f"answer {i}"})
+        i += 1
+    return tuple(history[:items])
+
+
+def sdk_last_turns(n: int):
+    # What a hand-written filter does today: copy, then scan everything
+    def keep_last(data: HandoffInputData) -> HandoffInputData:
+        history = list(data.input_history)
+        starts = [i for i, item in enumerate(history) if item.get("role") == "user"]
+        return HandoffInputData(tuple(history[starts[-n]:]), data.pre_handoff_items, data.new_items)
+
+    return keep_last
+
+
+def measure(name: str, input_filter, data: HandoffInputData, repeat: int) -> None:
+    times = []
+    for _ in range(repeat):
+        t = perf_counter()
+        list(input_filter(data).input_history)
+        times.append(perf_counter() - t)
+    tracemalloc.start()
+    filtered = input_filter(data)
+    _, filter_peak = tracemalloc.get_traced_memory()
+    list(filtered.input_history)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    times.sort()
+    print(f"{name:<34} {times[len(times) // 2] * 1000:>8.3f}ms {filter_peak / 1024:>10.1f}KiB {peak / 1024:>10.1f}KiB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=10_000)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    data = HandoffInputData(synthetic_history(args.items), (), ())
+
+    print(f"{args.items} history items")
+    print(f"{'filter':<34} {'p50':>10} {'filter peak':>13} {'with list()':>13}")
+    measure("sdk remove_all_tools", handoff_filters.remove_all_tools, data, args.repeat)
+    measure("view remove_all_tools", history_view.remove_all_tools, data, args.repeat)
+    measure(f"sdk-style last {args.turns} turns", sdk_last_turns(args.turns), data, args.repeat)
+    measure(f"view last {args.turns} turns", history_view.last_turns(args.turns), data, args.repeat)
+    chained_sdk = lambda d: sdk_last_turns(args.turns)(handoff_filters.remove_all_tools(d))
+    measure("sdk remove tools + last turns", chained_sdk, data, args.repeat)
+    chained_view = history_view.chain(history_view.last_turns(args.turns), history_view.remove_all_tools)
+    measure("view last turns + remove tools", chained_view, data, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
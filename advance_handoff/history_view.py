@@ -0,0 +1,137 @@
+import dataclasses
+from array import array
+from collections.abc import Callable, Iterator, Sequence
+from itertools import compress
+from typing import Any, TypeVar, overload
+
+from agents import HandoffInputData
+from agents.items import HandoffCallItem, HandoffOutputItem, ToolCallItem, ToolCallOutputItem
+
+T = TypeVar("T")
+
+HandoffFilter = Callable[[HandoffInputData], HandoffInputData]
+
+TOOL_TYPES = frozenset({
+    "function_call",
+    "function_call_output",
+    "computer_call",
+    "computer_call_output",
+    "file_search_call",
+    "web_search_call",
+})
+TOOL_ITEMS = (HandoffCallItem, HandoffOutputItem, ToolCallItem, ToolCallOutputItem)
+
+
+class HistoryView(Sequence[T]):
+    """Read-only view of a history: the original tuple plus the positions it shows.
+
+    Positions are a `range` for slices (no allocation) or an `array` of ints for
+    masks (8 bytes per kept item). Slicing or filtering a view indexes the original
+    directly, so chained filters never copy items; the runner copies once when it
+    does `list(view)`.
+    """
+
+    __slots__ = ("_base", "_index")
+
+    def __init__(self, base: Sequence[T], index: range | array | None = None):
+        self._base = base
+        self._index = range(len(base)) if index is None else index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @overload
+    def __getitem__(self, i: int) -> T: ...
+    @overload
+    def __getitem__(self, i: slice) -> "HistoryView[T]": ...
+    def __getitem__(self, i: int | slice) -> Any:
+        if isinstance(i, slice):
+            return HistoryView(self._base, self._index[i])
+        return self._base[self._index[i]]
+
+    def __iter__(self) -> Iterator[T]:
+        return map(self._base.__getitem__, self._index)
+
+    def __repr__(self) -> str:
+        return f"HistoryView({len(self)} of {len(self._base)} items)"
+
+    def _full(self) -> bool:
+        return self._index == range(len(self._base))
+
+    def _items(self) -> Iterator[T]:
+        return iter(self._base) if self._full() else iter(self)
+
+    def _keep(self, mask: list[bool]) -> "HistoryView[T]":
+        # The mask holds only the shared True/False objects; compress feeds the
+        # kept positions straight into the array, with no int objects in between
+        return HistoryView(self._base, array("q", compress(self._index, mask)))
+
+    def where(self, keep: Callable[[T], bool]) -> "HistoryView[T]":
+        return self._keep([bool(keep(item)) for item in self._items()])
+
+    def without_types(self, types: frozenset[str]) -> "HistoryView[T]":
+        """Drop input items whose `type` is in `types` (inlined, no call per item)."""
+        return self._keep([item.get("type") not in types for item in self._items()])
+
+
+def view(items: str | Sequence[T]) -> Any:
+    if isinstance(items, (str, HistoryView)):
+        return items
+    return HistoryView(items)
+
+
+def _not_tool_item(item: Any) -> bool:
+    return not isinstance(item, TOOL_ITEMS)
+
+
+def _turn_start(item: Any) -> bool:
+    return item.get("role") == "user"
+
+
+def remove_all_tools(data: HandoffInputData) -> HandoffInputData:
+    """Same result as `handoff_filters.remove_all_tools`, returned as views.
+
+    On its own this is no faster than the SDK filter, so use that unless it is
+    chained with a slice such as `last_turns`.
+    """
+    history = data.input_history
+    return dataclasses.replace(
+        data,
+        input_history=history if isinstance(history, str) else view(history).without_types(TOOL_TYPES),
+        pre_handoff_items=view(data.pre_handoff_items).where(_not_tool_item),
+        new_items=view(data.new_items).where(_not_tool_item),
+    )
+
+
+def last_turns(n: int) -> HandoffFilter:
+    """Keep the last `n` user turns of the input history.
+
+    Walks back from the end only as far as needed, and returns a slice.
+    """
+
+    def keep_last(data: HandoffInputData) -> HandoffInputData:
+        history = data.input_history
+        if isinstance(history, str):
+            return data
+        history = view(history)
+        seen, start = 0, 0
+        for i in range(len(history) - 1, -1, -1):
+            if _turn_start(history[i]):
+                seen += 1
+                if seen == n:
+                    start = i
+                    break
+        return dataclasses.replace(data, input_history=history[start:])
+
+    return keep_last
+
+
+def chain(*filters: HandoffFilter) -> HandoffFilter:
+    """Apply filters left to right; each one works on the previous one's views."""
+
+    def run(data: HandoffInputData) -> HandoffInputData:
+        for f in filters:
+            data = f(data)
+        return data
+
+    return run
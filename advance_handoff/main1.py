@@ -1,9 +1,10 @@
 from agents import Agent, Runner, handoff, RunContextWrapper, function_tool
-from agents.extensions import handoff_filters
+import history_view
 from dotenv import load_dotenv , find_dotenv    
 import os
 import asyncio
 from pydantic import BaseModel
+from agent_runtime.graph import compile_graph
 
 _:bool = load_dotenv(find_dotenv())
 
@@ -39,13 +40,18 @@ general_agent = Agent(name = "general Agent",
 handoff(agent = refund_agent, tool_name_override = "external_refund",
         tool_description_override = "Use this tool to refund an order",
         on_handoff=refund,
-        input_filter=handoff_filters.remove_all_tools,
+        # The refund agent only needs the last few turns, without tool calls;
+        # the views slice and filter the history without copying it
+        input_filter=history_view.chain(history_view.last_turns(3), history_view.remove_all_tools),
         is_enabled=can_refund)]
 )
 
+# Handoffs are built once; only can_refund is still checked on every turn
+graph = compile_graph(general_agent, [billing_agent, refund_agent])
+
 async def main():
     result = await Runner.run(
-        general_agent,
+        graph.entry,
         "What is the weather in karachi and secondly I need to refund my order. Details : order id : 804, reason : wrong item",
         context=MyInfo(name="Suhaib", age=21)
     )
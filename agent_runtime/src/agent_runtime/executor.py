@@ -0,0 +1,91 @@
+import asyncio
+import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from time import perf_counter
+from typing import Any
+
+from agents import Agent, Runner
+from agents.result import RunResult, RunResultStreaming
+
+
+def cancel_run(result: RunResultStreaming) -> None:
+    """Stops a streamed run's background tasks.
+
+    `RunResultStreaming.cancel()` only exists in newer SDKs; on older ones the
+    tasks are cancelled directly, the way `cancel()` does it.
+    """
+    cancel = getattr(result, "cancel", None)
+    if cancel is not None:
+        cancel()
+        return
+    result._cleanup_tasks()
+    result.is_complete = True
+
+
+class RunExecutor:
+    """Awaits agent runs on the Chainlit event loop with a per-process cap.
+
+    Handlers must never call `Runner.run_sync` here: it blocks the loop, so every
+    other session waits for the LLM call to finish. Runs past the cap queue up on a
+    semaphore and the queue depth is tracked in `stats()`.
+    """
+
+    def __init__(self, max_in_flight: int | None = None):
+        self.max_in_flight = max_in_flight or int(os.getenv("MAX_IN_FLIGHT_RUNS", "16"))
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        self.in_flight = 0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.completed = 0
+        self.total_wait_s = 0.0
+
+    @asynccontextmanager
+    async def _slot(self) -> AsyncIterator[None]:
+        self.queue_depth += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        start = perf_counter()
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queue_depth -= 1
+        self.total_wait_s += perf_counter() - start
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self._semaphore.release()
+
+    async def run(self, agent: Agent[Any], input: Any, **kwargs: Any) -> RunResult:
+        async with self._slot():
+            return await Runner.run(agent, input, **kwargs)
+
+    @asynccontextmanager
+    async def streamed(
+        self, agent: Agent[Any], input: Any, **kwargs: Any
+    ) -> AsyncIterator[RunResultStreaming]:
+        """Holds a slot while the caller consumes `result.stream_events()`."""
+        async with self._slot():
+            result = Runner.run_streamed(agent, input, **kwargs)
+            try:
+                yield result
+            finally:
+                if not result.is_complete:
+                    cancel_run(result)
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "completed": self.completed,
+            "avg_wait_ms": round(self.total_wait_s / self.completed * 1000, 2)
+            if self.completed
+            else 0.0,
+        }
+
+
+executor = RunExecutor()
@@ -0,0 +1,157 @@
+import dataclasses
+from dataclasses import dataclass, field
+from typing import Any
+
+from agents import Agent, Handoff, RunContextWrapper, UserError, handoff
+
+
+@dataclass
+class CompiledGraph:
+    """Frozen copies of every agent reachable from `entry`, keyed by name.
+
+    Each copy's `handoffs` holds prebuilt `Handoff` objects pointing at the other
+    copies, so the runner no longer rebuilds them from bare agents on every turn.
+    """
+
+    entry: Agent[Any]
+    agents: dict[str, Agent[Any]]
+    edges: dict[str, list[str]]
+    cycles: list[list[str]]
+    dynamic: dict[str, list[str]] = field(default_factory=dict)
+    """What is still evaluated per turn, per agent (callable instructions or `is_enabled`)."""
+
+    def describe(self) -> dict[str, Any]:
+        return {
+            "entry": self.entry.name,
+            "agents": list(self.agents),
+            "edges": self.edges,
+            "cycles": self.cycles,
+            "dynamic": self.dynamic,
+        }
+
+
+def _target(item: Agent[Any] | Handoff, by_name: dict[str, Agent[Any]]) -> Agent[Any]:
+    if isinstance(item, Agent):
+        return item
+    if item.agent_name not in by_name:
+        raise UserError(f"Handoff {item.tool_name} points at unknown agent {item.agent_name!r}")
+    return by_name[item.agent_name]
+
+
+def _collect(entry: Agent[Any], known: list[Agent[Any]]) -> dict[str, Agent[Any]]:
+    """Every agent reachable from `entry`. A `Handoff` only knows its target's name,
+    so targets of prebuilt handoffs must be reachable as agents or passed in `known`."""
+    by_name = {agent.name: agent for agent in known}
+    found: dict[str, Agent[Any]] = {}
+    stack = [entry]
+    while stack:
+        agent = stack.pop()
+        if agent.name in found:
+            if found[agent.name] is not agent:
+                raise UserError(f"Two different agents are named {agent.name!r}")
+            continue
+        found[agent.name] = agent
+        by_name.setdefault(agent.name, agent)
+        for item in agent.handoffs:
+            if isinstance(item, Agent):
+                by_name.setdefault(item.name, item)
+        for item in agent.handoffs:
+            target = _target(item, by_name)
+            if target.name not in found:
+                stack.append(target)
+    return found
+
+
+def _find_cycles(edges: dict[str, list[str]], entry: str) -> list[list[str]]:
+    cycles: list[list[str]] = []
+    path: list[str] = []
+    state: dict[str, int] = {}  # 1 = on the current path, 2 = done
+
+    def visit(name: str) -> None:
+        state[name] = 1
+        path.append(name)
+        for nxt in edges[name]:
+            if state.get(nxt) == 1:
+                cycles.append(path[path.index(nxt):] + [nxt])
+            elif nxt not in state:
+                visit(nxt)
+        path.pop()
+        state[name] = 2
+
+    visit(entry)
+    return cycles
+
+
+def _retarget(item: Handoff, target: Agent[Any]) -> Any:
+    """Run the original handoff (and its `on_handoff`), then continue with the frozen copy."""
+
+    async def invoke(ctx: RunContextWrapper[Any], input_json: str | None = None) -> Agent[Any]:
+        await item.on_invoke_handoff(ctx, input_json)
+        return target
+
+    return invoke
+
+
+def compile_graph(
+    entry: Agent[Any],
+    agents: list[Agent[Any]] | None = None,
+    *,
+    allow_cycles: bool = False,
+) -> CompiledGraph:
+    """Freeze the agent graph starting at `entry`.
+
+    `agents` lists every agent the graph is meant to use: targets of prebuilt
+    `handoff(...)` objects must be in it, and any listed agent that can't be
+    reached from `entry` is reported as an error. Cycles (a specialist handing
+    back to triage) are an error unless `allow_cycles` is set.
+
+    Handoffs whose `is_enabled` is a plain bool are resolved here; callables are
+    kept and still evaluated on every turn.
+    """
+    originals = _collect(entry, agents or [])
+    unreachable = [agent.name for agent in agents or [] if agent.name not in originals]
+    if unreachable:
+        raise UserError(f"Agents not reachable from {entry.name}: {', '.join(unreachable)}")
+
+    frozen = {name: agent.clone() for name, agent in originals.items()}
+    edges: dict[str, list[str]] = {}
+    dynamic: dict[str, list[str]] = {}
+
+    for name, agent in originals.items():
+        copy = frozen[name]
+        handoffs: list[Handoff] = []
+        for item in agent.handoffs:
+            target = frozen[_target(item, originals).name]
+            if isinstance(item, Agent):
+                built = handoff(target)
+            else:
+                enabled = getattr(item, "is_enabled", True)
+                if enabled is False:
+                    continue
+                built = dataclasses.replace(item, on_invoke_handoff=_retarget(item, target))
+                if callable(enabled):
+                    dynamic.setdefault(name, []).append(f"is_enabled of {item.tool_name}")
+            handoffs.append(built)
+        copy.handoffs = handoffs
+        copy.tools = list(agent.tools)
+        edges[name] = [h.agent_name for h in handoffs]
+
+        for tool in copy.tools:
+            if callable(getattr(tool, "is_enabled", True)):
+                dynamic.setdefault(name, []).append(f"is_enabled of {tool.name}")
+        if callable(copy.instructions):
+            dynamic.setdefault(name, []).append("instructions")
+
+    cycles = _find_cycles(edges, entry.name)
+    if cycles and not allow_cycles:
+        loops = "; ".join(" -> ".join(cycle) for cycle in cycles)
+        raise UserError(f"Handoff cycles found: {loops} (pass allow_cycles=True if intended)")
+
+    return CompiledGraph(
+        entry=frozen[entry.name],
+        agents=frozen,
+        edges=edges,
+        cycles=cycles,
+        dynamic=dynamic,
+    )
+
@@ -0,0 +1,126 @@
+import asyncio
+import json
+import logging
+import os
+from typing import Any
+
+from agents import Agent
+from agents.run import RunConfig
+
+from agent_runtime.executor import RunExecutor, executor
+
+logger = logging.getLogger("agent_runtime.history")
+
+TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "4000"))
+
+summarizer = Agent(
+    name="History Summarizer",
+    instructions="You compress chat history. Given an earlier summary and the next turns of a \
+        conversation, write one updated summary of everything the assistant needs to remember: \
+        facts about the user, decisions, open questions. Be concise, under 200 words, no preamble.",
+)
+
+
+def estimate_tokens(item: Any) -> int:
+    """Roughly 4 characters per token, which is close enough to budget with."""
+    content = item.get("content") if isinstance(item, dict) else None
+    if isinstance(content, str):
+        return len(content) // 4 + 4
+    return len(json.dumps(item, default=str)) // 4 + 4
+
+
+def _render(turns: list[list[Any]]) -> str:
+    lines = []
+    for turn in turns:
+        for item in turn:
+            if isinstance(item, dict) and isinstance(item.get("content"), str):
+                lines.append(f"{item.get('role', 'assistant')}: {item['content']}")
+            else:
+                lines.append(json.dumps(item, default=str))
+    return "\n".join(lines)
+
+
+class HistoryManager:
+    """Chat history that keeps each turn's input under a token budget.
+
+    Items are grouped into turns (a user message and everything that follows it), so
+    tool calls are never split from their outputs. `input()` returns the cached
+    summary plus as many recent turns as fit in the budget. Turns that fall out of
+    the window are folded into the summary by a background task, never on the
+    request path. Summaries run through `runs` (the process-wide executor by
+    default), so they count against the same cap as the chat turns.
+    """
+
+    def __init__(
+        self,
+        run_config: RunConfig,
+        budget: int = TOKEN_BUDGET,
+        summary_share: float = 0.25,
+        runs: RunExecutor = executor,
+    ):
+        self.run_config = run_config
+        self.runs = runs
+        self.budget = budget
+        self.summary_budget = int(budget * summary_share)
+        self.summary: str | None = None
+        self.summary_tokens = 0
+        self._turns: list[list[Any]] = []
+        self._turn_tokens: list[int] = []
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def total_tokens(self) -> int:
+        return self.summary_tokens + sum(self._turn_tokens)
+
+    def append(self, item: Any) -> None:
+        if not self._turns or (isinstance(item, dict) and item.get("role") == "user"):
+            self._turns.append([])
+            self._turn_tokens.append(0)
+        self._turns[-1].append(item)
+        self._turn_tokens[-1] += estimate_tokens(item)
+
+    def extend(self, items: list[Any]) -> None:
+        for item in items:
+            self.append(item)
+
+    def _window_start(self) -> int:
+        """Index of the oldest turn that still fits next to the summary."""
+        remaining = self.budget - self.summary_tokens
+        start = len(self._turns)
+        while start > 0:
+            cost = self._turn_tokens[start - 1]
+            # The latest turn is always sent, even when it alone is over budget
+            if cost > remaining and start < len(self._turns):
+                break
+            remaining -= cost
+            start -= 1
+        return start
+
+    def input(self) -> list[Any]:
+        items: list[Any] = []
+        if self.summary:
+            items.append({"role": "system", "content": f"Summary of the earlier conversation: {self.summary}"})
+        for turn in self._turns[self._window_start():]:
+            items.extend(turn)
+        return items
+
+    def compact(self) -> None:
+        """Schedule folding the turns outside the window into the summary."""
+        if self._task is not None and not self._task.done():
+            return
+        start = self._window_start()
+        if start == 0:
+            return
+        self._task = asyncio.create_task(self._summarize(start))
+
+    async def _summarize(self, count: int) -> None:
+        prompt = f"Earlier summary: {self.summary or '(none)'}\n\nNext turns:\n{_render(self._turns[:count])}"
+        try:
+            result = await self.runs.run(summarizer, prompt, run_config=self.run_config)
+        except Exception:
+            logger.warning("History summarization failed, will retry next turn", exc_info=True)
+            return
+        self.summary = str(result.final_output)[: self.summary_budget * 4]
+        self.summary_tokens = estimate_tokens({"content": self.summary})
+        del self._turns[:count]
+        del self._turn_tokens[:count]
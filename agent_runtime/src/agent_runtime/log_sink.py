@@ -0,0 +1,161 @@
+import atexit
+import copy
+import hashlib
+import json
+import logging
+import os
+import random
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from queue import Full, Queue
+from typing import Any, TextIO
+
+# Attributes every LogRecord has; anything else was passed with `extra=`
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+_formatter = logging.Formatter()
+
+
+def redact(value: Any, max_chars: int) -> Any:
+    """Cut long strings down to `max_chars`, keeping their length and a hash."""
+    if isinstance(value, (int, float, bool, type(None))):
+        return value
+    if not isinstance(value, str):
+        value = json.dumps(value, ensure_ascii=False, default=str)
+    if len(value) <= max_chars:
+        return value
+    digest = hashlib.sha1(value.encode(errors="replace")).hexdigest()[:10]
+    return f"{value[:max_chars]}…[{len(value)} chars, sha1 {digest}]"
+
+
+class JsonFormatter(logging.Formatter):
+    """One compact JSON object per line: time, level, logger, message and any extras."""
+
+    def __init__(self, max_chars: int = 512):
+        super().__init__()
+        self.max_chars = max_chars
+        self._json = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: dict[str, Any] = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": redact(record.getMessage(), self.max_chars),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = redact(value, self.max_chars)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = redact(record.exc_text, self.max_chars * 4)
+        return self._json.encode(entry)
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a fraction of the records of each category; warnings and errors always pass.
+
+    A record's category is its `category` extra, or else its logger name. Rates
+    match the longest dotted prefix, so `{"openai.agents": 0.1}` also covers
+    `openai.agents.tracing`. Categories without a rate are all kept.
+    """
+
+    def __init__(self, rates: dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._resolved: dict[str, float] = {}
+
+    def rate(self, category: str) -> float:
+        rate = self._resolved.get(category)
+        if rate is None:
+            name = category
+            while name and name not in self.rates:
+                name = name.rpartition(".")[0]
+            rate = self._resolved[category] = self.rates.get(name, 1.0)
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rate(getattr(record, "category", record.name))
+        return rate >= 1.0 or random.random() < rate
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Hands records to the writer thread; when the queue is full they are counted and dropped."""
+
+    def __init__(self, queue: Queue):
+        super().__init__(queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only what must happen while args and exc_info are still valid; the
+        # JSON encoding is left to the writer thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except Full:
+            self.dropped += 1
+
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # Wait for room instead of failing when the queue is full at exit
+        self.queue.put(self._sentinel)
+
+
+def _rates_from_env() -> dict[str, float]:
+    # LOG_SAMPLE="openai.agents=0.1,chat.guardrail=0.01"
+    rates = {}
+    for part in os.getenv("LOG_SAMPLE", "").split(","):
+        if "=" in part:
+            name, rate = part.split("=", 1)
+            rates[name.strip()] = float(rate)
+    return rates
+
+
+def enable_structured_logging(
+    loggers: tuple[str, ...] = ("openai.agents",),
+    *,
+    level: int | str | None = None,
+    sample: dict[str, float] | None = None,
+    max_chars: int | None = None,
+    stream: TextIO = sys.stdout,
+    queue_size: int = 10_000,
+) -> DroppingQueueHandler:
+    """Drop-in replacement for `enable_verbose_stdout_logging()`.
+
+    The calling code only builds the record and puts it on a queue; a background
+    thread encodes it as a JSON line and writes it to `stream`. Sampling happens
+    before the queue, so dropped records cost almost nothing. `level`, `sample`
+    and `max_chars` default to the LOG_LEVEL, LOG_SAMPLE and LOG_MAX_CHARS
+    environment variables; the level is INFO unless set, since DEBUG writes a
+    line for every model call, verdict and answer. Returns the handler, whose
+    `dropped` counts records lost to a full queue.
+    """
+    if level is None:
+        level = os.getenv("LOG_LEVEL", "INFO").upper()
+    handler = DroppingQueueHandler(Queue(maxsize=queue_size))
+    handler.addFilter(SamplingFilter(sample if sample is not None else _rates_from_env()))
+
+    output = logging.StreamHandler(stream)
+    output.setFormatter(JsonFormatter(max_chars or int(os.getenv("LOG_MAX_CHARS", "512"))))
+    listener = _Listener(handler.queue, output)
+    listener.start()
+    # Write out what is still queued when the process exits
+    atexit.register(listener.stop)
+
+    for name in loggers:
+        logger = logging.getLogger(name)
+        logger.setLevel(level)
+        logger.addHandler(handler)
+        logger.propagate = False
+    return handler
@@ -0,0 +1,149 @@
+import dataclasses
+import hashlib
+import json
+from collections import deque
+from collections.abc import AsyncIterator
+from typing import Any, Literal
+
+from agents import Model, ModelResponse, ModelSettings, TResponseInputItem
+from openai.types.responses import ResponseCompletedEvent
+
+# Separates the volatile tail of a system prompt from its stable part
+VOLATILE_MARKER = "\n\n<<volatile>>\n"
+
+CacheHints = Literal["openai", "anthropic"]
+
+
+def layered_instructions(static: str, semi_static: str = "", volatile: str = "") -> str:
+    """Build a system prompt in cache-friendly order.
+
+    `static` never changes, `semi_static` changes rarely (e.g. a user profile cached
+    per session) and `volatile` changes every turn (time, retrieved memories). With
+    `PrefixCacheModel` the volatile part is moved after the conversation, so it
+    never breaks the cached prefix. Without it, the marker is harmless text.
+    """
+    prompt = static if not semi_static else f"{static}\n\n{semi_static}"
+    return f"{prompt}{VOLATILE_MARKER}{volatile}" if volatile else prompt
+
+
+def split_instructions(system_instructions: str | None) -> tuple[str | None, str | None]:
+    if system_instructions is None or VOLATILE_MARKER not in system_instructions:
+        return system_instructions, None
+    stable, volatile = system_instructions.split(VOLATILE_MARKER, 1)
+    return stable, volatile
+
+
+class PromptCacheStats:
+    """Cached-token counts per request, plus how many distinct prefixes were sent."""
+
+    def __init__(self, maxlen: int = 500):
+        self.records: deque[dict[str, Any]] = deque(maxlen=maxlen)
+        self.prefixes: dict[str, int] = {}
+
+    def add(self, model: str, prefix: str, input_tokens: int, cached_tokens: int) -> None:
+        self.prefixes[prefix] = self.prefixes.get(prefix, 0) + 1
+        self.records.append({
+            "model": model,
+            "prefix": prefix,
+            "input_tokens": input_tokens,
+            "cached_tokens": cached_tokens,
+        })
+
+    def summary(self) -> dict[str, Any]:
+        input_tokens = sum(r["input_tokens"] for r in self.records)
+        cached_tokens = sum(r["cached_tokens"] for r in self.records)
+        return {
+            "requests": len(self.records),
+            "input_tokens": input_tokens,
+            "cached_tokens": cached_tokens,
+            "cached_ratio": round(cached_tokens / input_tokens, 3) if input_tokens else None,
+            "distinct_prefixes": len(self.prefixes),
+            "last": list(self.records)[-5:],
+        }
+
+
+stats = PromptCacheStats()
+
+
+class PrefixCacheModel(Model):
+    """Wraps a model so every request is laid out static → semi-static → volatile.
+
+    - The system prompt keeps only its stable part; anything after
+      `VOLATILE_MARKER` is sent as a message after the conversation instead.
+    - `hints` adds provider cache hints: a `prompt_cache_key` for OpenAI, or
+      LiteLLM's cache-control injection on the system message for Anthropic.
+    - Cached input tokens reported in usage are recorded in `stats`.
+    """
+
+    def __init__(
+        self,
+        model: Model,
+        *,
+        hints: CacheHints | None = None,
+        cache_key: str | None = None,
+        volatile_role: str = "system",
+    ):
+        self.inner = model
+        self.model = getattr(model, "model", type(model).__name__)
+        self.hints = hints
+        self.cache_key = cache_key
+        self.volatile_role = volatile_role
+
+    def _settings(self, model_settings: ModelSettings, prefix: str) -> ModelSettings:
+        if self.hints is None:
+            return model_settings
+        extra_body = dict(model_settings.extra_body or {}) if isinstance(model_settings.extra_body, dict) else {}
+        if self.hints == "openai":
+            extra_body.setdefault("prompt_cache_key", self.cache_key or prefix)
+        elif self.hints == "anthropic":
+            extra_body.setdefault("cache_control_injection_points", [{"location": "message", "role": "system"}])
+        return dataclasses.replace(model_settings, extra_body=extra_body)
+
+    def _assemble(
+        self, system_instructions: str | None, input: str | list[TResponseInputItem], tools: list[Any]
+    ) -> tuple[str | None, str | list[TResponseInputItem], str]:
+        stable, volatile = split_instructions(system_instructions)
+        if volatile:
+            items = [{"role": "user", "content": input}] if isinstance(input, str) else list(input)
+            items.append({"role": self.volatile_role, "content": volatile})
+            input = items
+        tool_names = [getattr(tool, "name", "") for tool in tools]
+        prefix = hashlib.sha256(json.dumps([stable, tool_names]).encode()).hexdigest()[:12]
+        return stable, input, prefix
+
+    def _record(self, prefix: str, usage: Any) -> None:
+        cached = getattr(getattr(usage, "input_tokens_details", None), "cached_tokens", 0) or 0
+        stats.add(str(self.model), prefix, getattr(usage, "input_tokens", 0) or 0, cached)
+
+    async def get_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Any],
+        *args: Any,
+        **kwargs: Any,
+    ) -> ModelResponse:
+        system_instructions, input, prefix = self._assemble(system_instructions, input, tools)
+        response = await self.inner.get_response(
+            system_instructions, input, self._settings(model_settings, prefix), tools, *args, **kwargs
+        )
+        self._record(prefix, response.usage)
+        return response
+
+    async def stream_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Any],
+        *args: Any,
+        **kwargs: Any,
+    ) -> AsyncIterator[Any]:
+        system_instructions, input, prefix = self._assemble(system_instructions, input, tools)
+        async for event in self.inner.stream_response(
+            system_instructions, input, self._settings(model_settings, prefix), tools, *args, **kwargs
+        ):
+            if isinstance(event, ResponseCompletedEvent) and event.response.usage:
+                self._record(prefix, event.response.usage)
+            yield event
@@ -0,0 +1,108 @@
+import importlib.util
+import os
+from threading import Lock
+from typing import Any
+
+import httpx
+from agents import AsyncOpenAI, OpenAIChatCompletionsModel
+from agents.models.interface import Model
+from openai import DefaultAsyncHttpxClient
+
+# HTTP/2 needs the optional `h2` package (`httpx[http2]`); fall back to keep-alive HTTP/1.1
+HTTP2 = importlib.util.find_spec("h2") is not None
+
+POOL_LIMITS = httpx.Limits(
+    max_connections=int(os.getenv("HTTP_POOL_MAX_CONNECTIONS", "100")),
+    max_keepalive_connections=int(os.getenv("HTTP_POOL_MAX_KEEPALIVE", "20")),
+    keepalive_expiry=float(os.getenv("HTTP_POOL_KEEPALIVE_EXPIRY", "120")),
+)
+TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+
+
+class _CountingTransport(httpx.AsyncHTTPTransport):
+    """Counts requests and newly opened sockets so connection reuse is visible."""
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.requests = 0
+        self.connections_opened = 0
+        create_connection = self._pool.create_connection
+
+        def counting_create_connection(origin):
+            self.connections_opened += 1
+            return create_connection(origin)
+
+        self._pool.create_connection = counting_create_connection
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        return await super().handle_async_request(request)
+
+    @property
+    def open_connections(self) -> int:
+        return len(self._pool.connections)
+
+
+class ModelRegistry:
+    """Process-wide clients and models, built on first use and shared by every session.
+
+    Clients are keyed by (base_url, api_key) and share one tuned connection pool each;
+    models are keyed by (base_url, model, api_key).
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._clients: dict[tuple[str | None, str | None], AsyncOpenAI] = {}
+        self._transports: dict[tuple[str | None, str | None], _CountingTransport] = {}
+        self._models: dict[tuple[str | None, str, str | None], Model] = {}
+
+    def client(self, base_url: str | None, api_key: str | None) -> AsyncOpenAI:
+        key = (base_url, api_key)
+        with self._lock:
+            if key not in self._clients:
+                transport = _CountingTransport(http2=HTTP2, limits=POOL_LIMITS)
+                self._transports[key] = transport
+                self._clients[key] = AsyncOpenAI(
+                    api_key=api_key,
+                    base_url=base_url,
+                    http_client=DefaultAsyncHttpxClient(transport=transport, timeout=TIMEOUT),
+                )
+            return self._clients[key]
+
+    def model(self, model: str, *, base_url: str | None, api_key: str | None) -> Model:
+        key = (base_url, model, api_key)
+        if key not in self._models:
+            client = self.client(base_url, api_key)
+            with self._lock:
+                self._models.setdefault(
+                    key, OpenAIChatCompletionsModel(model=model, openai_client=client)
+                )
+        return self._models[key]
+
+    def litellm_model(self, model: str, *, api_key: str | None, base_url: str | None = None) -> Model:
+        """Shared `LitellmModel`; LiteLLM pools its own HTTP connections per model."""
+        from agents.extensions.models.litellm_model import LitellmModel
+
+        key = (base_url, f"litellm/{model}", api_key)
+        with self._lock:
+            if key not in self._models:
+                self._models[key] = LitellmModel(model=model, api_key=api_key, base_url=base_url)
+            return self._models[key]
+
+    def stats(self) -> dict[str, Any]:
+        clients = []
+        for (base_url, _), transport in self._transports.items():
+            clients.append({
+                "base_url": base_url,
+                "http2": HTTP2,
+                "requests": transport.requests,
+                "connections_opened": transport.connections_opened,
+                "open_connections": transport.open_connections,
+                "requests_per_connection": round(
+                    transport.requests / transport.connections_opened, 2
+                ) if transport.connections_opened else 0.0,
+            })
+        return {"models": len(self._models), "clients": clients}
+
+
+registry = ModelRegistry()
@@ -0,0 +1,93 @@
+import re
+from dataclasses import dataclass, field
+from typing import Any
+
+from agents import Agent
+
+_WORD = re.compile(r"[a-z0-9+#]+")
+
+# Words that say nothing about which specialist should answer
+STOPWORDS = {
+    "all", "and", "any", "for", "handle", "handles", "handling", "its",
+    "queries", "query", "regarding", "regaring", "specialized", "the", "with",
+}
+
+
+def tokenize(text: str) -> list[str]:
+    return _WORD.findall(text.lower())
+
+
+@dataclass
+class _Node:
+    children: dict[str, "_Node"] = field(default_factory=dict)
+    target: str | None = None
+
+
+class HandoffRouter:
+    """Keyword router compiled from a triage agent's handoffs.
+
+    Each handoff agent gets the distinctive words of its `handoff_description` plus
+    any configured keywords (single words or phrases). They are compiled into a trie
+    over tokens, so a query is matched in one left-to-right pass. `route` returns the
+    specialist to start at when every match points at the same agent, and None when
+    nothing or more than one agent matched, leaving the decision to the triage LLM.
+    """
+
+    def __init__(self, triage: Agent[Any], keywords: dict[str, list[str]] | None = None):
+        self.triage = triage
+        self.routed = 0
+        self.fallbacks = 0
+        self._root = _Node()
+        self._targets: dict[str, Agent[Any]] = {}
+
+        specialists = [h for h in triage.handoffs if isinstance(h, Agent)]
+        described = {
+            agent.name: {
+                w for w in tokenize(agent.handoff_description or "")
+                if len(w) > 2 and w not in STOPWORDS
+            }
+            for agent in specialists
+        }
+        for agent in specialists:
+            # The run starts past the triage agent, so its input guardrails move along
+            self._targets[agent.name] = agent.clone(
+                input_guardrails=triage.input_guardrails + agent.input_guardrails
+            )
+            others = set().union(*(words for name, words in described.items() if name != agent.name))
+            phrases = [w for w in described[agent.name] if w not in others]
+            phrases += (keywords or {}).get(agent.name, [])
+            for phrase in phrases:
+                self._add(tokenize(phrase), agent.name)
+
+    def _add(self, tokens: list[str], target: str) -> None:
+        if not tokens:
+            return
+        node = self._root
+        for token in tokens:
+            node = node.children.setdefault(token, _Node())
+        node.target = target
+
+    def matches(self, text: str) -> set[str]:
+        """Names of every agent whose keywords occur in `text`."""
+        tokens = tokenize(text)
+        found: set[str] = set()
+        for start in range(len(tokens)):
+            node = self._root
+            for token in tokens[start:]:
+                node = node.children.get(token)
+                if node is None:
+                    break
+                if node.target is not None:
+                    found.add(node.target)
+        return found
+
+    def route(self, text: str) -> Agent[Any] | None:
+        found = self.matches(text)
+        if len(found) != 1:
+            self.fallbacks += 1
+            return None
+        self.routed += 1
+        return self._targets[found.pop()]
+
+    def stats(self) -> dict[str, int]:
+        return {"routed": self.routed, "fallbacks": self.fallbacks}
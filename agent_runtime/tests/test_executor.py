@@ -0,0 +1,44 @@
+import asyncio
+from typing import Any
+
+from agents import Agent, Model, set_tracing_disabled
+from openai.types.responses import ResponseTextDeltaEvent
+
+from agent_runtime.executor import RunExecutor
+
+set_tracing_disabled(True)
+
+
+class EndlessModel(Model):
+    """Streams one delta, then never finishes."""
+
+    def __init__(self):
+        self.cancelled = asyncio.Event()
+
+    async def get_response(self, *args: Any, **kwargs: Any) -> Any:
+        raise NotImplementedError
+
+    async def stream_response(self, *args: Any, **kwargs: Any):
+        yield ResponseTextDeltaEvent.model_construct(
+            type="response.output_text.delta", delta="hi", item_id="1", output_index=0, content_index=0
+        )
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            self.cancelled.set()
+            raise
+
+
+def test_leaving_a_stream_early_cancels_the_run():
+    async def scenario():
+        model = EndlessModel()
+        executor = RunExecutor(max_in_flight=1)
+        async with executor.streamed(Agent(name="a", model=model), "hello") as result:
+            async for event in result.stream_events():
+                if event.type == "raw_response_event":
+                    break
+        await asyncio.wait_for(model.cancelled.wait(), 1)
+        assert result.is_complete
+        assert executor.in_flight == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,55 @@
+import asyncio
+import logging
+from types import SimpleNamespace
+from typing import Any
+
+from agents.run import RunConfig
+
+from agent_runtime.history import HistoryManager
+
+
+class FakeExecutor:
+    def __init__(self, error: Exception | None = None):
+        self.error = error
+        self.runs: list[Any] = []
+
+    async def run(self, agent: Any, input: Any, **kwargs: Any) -> Any:
+        self.runs.append(input)
+        if self.error is not None:
+            raise self.error
+        return SimpleNamespace(final_output="they like short answers")
+
+
+def history_over_budget(runs: FakeExecutor) -> HistoryManager:
+    history = HistoryManager(RunConfig(), budget=40, runs=runs)
+    for i in range(4):
+        history.append({"role": "user", "content": f"question {i} " * 4})
+        history.append({"role": "assistant", "content": f"answer {i} " * 4})
+    return history
+
+
+def test_summaries_run_through_the_executor():
+    async def scenario():
+        runs = FakeExecutor()
+        history = history_over_budget(runs)
+        history.compact()
+        await history._task
+        assert len(runs.runs) == 1
+        assert history.summary == "they like short answers"
+        assert history.input()[0]["role"] == "system"
+
+    asyncio.run(scenario())
+
+
+def test_failed_summary_is_logged_and_keeps_the_turns(caplog):
+    async def scenario():
+        history = history_over_budget(FakeExecutor(RuntimeError("rate limited")))
+        history.compact()
+        await history._task
+        return history
+
+    with caplog.at_level(logging.WARNING, logger="agent_runtime.history"):
+        history = asyncio.run(scenario())
+    assert history.summary is None
+    assert len(history._turns) == 4
+    assert "History summarization failed" in caplog.text
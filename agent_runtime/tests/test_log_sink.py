@@ -0,0 +1,15 @@
+import io
+import logging
+
+from agent_runtime.log_sink import enable_structured_logging
+
+
+def test_debug_is_off_unless_log_level_says_so(monkeypatch):
+    monkeypatch.delenv("LOG_LEVEL", raising=False)
+    enable_structured_logging(("test.sink.default",), stream=io.StringIO())
+    assert not logging.getLogger("test.sink.default").isEnabledFor(logging.DEBUG)
+    assert logging.getLogger("test.sink.default").isEnabledFor(logging.INFO)
+
+    monkeypatch.setenv("LOG_LEVEL", "debug")
+    enable_structured_logging(("test.sink.debug",), stream=io.StringIO())
+    assert logging.getLogger("test.sink.debug").isEnabledFor(logging.DEBUG)
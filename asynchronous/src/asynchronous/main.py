@@ -1,8 +1,10 @@
 import chainlit as cl
 import os
 from dotenv import load_dotenv,find_dotenv
-from agents import Agent, Runner, AsyncOpenAI, OpenAIChatCompletionsModel
+from agents import Agent, AsyncOpenAI, OpenAIChatCompletionsModel
 from agents.run import RunConfig
+from agent_runtime.executor import executor
+from agent_runtime.history import HistoryManager
 _:bool=load_dotenv(find_dotenv())
 gemini_api_key = os.getenv("GEMINI_API_KEY")
 
@@ -25,7 +27,7 @@ agent: Agent = Agent(name="Assistant", instructions="You are a helpful assistant
 
 @cl.on_chat_start
 async def handle_chat_start():
-    cl.user_session.set("history", [])
+    cl.user_session.set("history", HistoryManager(config))
     await cl.Message(content="Hello! I'm you Personal Support Agent. How can I help you today?").send()
 
 @cl.on_message
@@ -34,12 +36,13 @@ async def handle_message(message: cl.Message):
     msg = cl.Message(content="")
     await msg.send()
     history.append({"role":"user","content":message.content})
-    result = await Runner.run(
+    result = await executor.run(
     agent,
-    input=history,
+    input=history.input(),
     run_config=config,
     
     )
    
-    cl.user_session.set("history", history)
+    history.append({"role":"assistant","content":result.final_output})
+    history.compact()
     await cl.Message(content=result.final_output).send()
\ No newline at end of file
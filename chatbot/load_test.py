@@ -0,0 +1,82 @@
+# uv run load_test.py --sessions 64 --latency 0.5
+"""Concurrency load test for the Chainlit run executor.
+
+Starts a fake OpenAI-compatible chat completions server on localhost, then sends
+`--sessions` concurrent runs through `RunExecutor` at several in-flight caps. With
+a cap of 1 the runs are served one at a time, which is what `Runner.run_sync` did
+inside the `@cl.on_message` handlers.
+"""
+import argparse
+import asyncio
+import time
+
+import uvicorn
+from agents import Agent
+from agents.run import RunConfig
+from fastapi import FastAPI
+
+from agent_runtime.executor import RunExecutor
+from agent_runtime.registry import registry
+
+
+def fake_openai_app(latency: float) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(body: dict):
+        await asyncio.sleep(latency)
+        return {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "Hello from the fake model"},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+        }
+
+    return app
+
+
+async def run_sessions(agent: Agent, config: RunConfig, sessions: int, cap: int) -> dict:
+    executor = RunExecutor(max_in_flight=cap)
+    history = [{"role": "user", "content": "Hi"}]
+    start = time.perf_counter()
+    await asyncio.gather(*(executor.run(agent, history, run_config=config) for _ in range(sessions)))
+    elapsed = time.perf_counter() - start
+    return {"cap": cap, "elapsed": elapsed, "throughput": sessions / elapsed, **executor.stats()}
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=64)
+    parser.add_argument("--latency", type=float, default=0.5, help="fake model latency in seconds")
+    parser.add_argument("--caps", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    server = uvicorn.Server(uvicorn.Config(fake_openai_app(args.latency), port=args.port, log_level="warning"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    model = registry.model("fake", base_url=f"http://127.0.0.1:{args.port}/v1/", api_key="fake")
+    config = RunConfig(model=model, tracing_disabled=True)
+    agent = Agent(name="Assistant", instructions="You are a helpful assistant", model=model)
+
+    print(f"{args.sessions} sessions, {args.latency * 1000:.0f} ms per model call")
+    print(f"{'cap':>5} {'wall s':>8} {'runs/s':>8} {'avg wait ms':>12} {'max queue':>10}")
+    for cap in args.caps:
+        r = await run_sessions(agent, config, args.sessions, cap)
+        print(f"{r['cap']:>5} {r['elapsed']:>8.2f} {r['throughput']:>8.1f} {r['avg_wait_ms']:>12.1f} {r['max_queue_depth']:>10}")
+    print("connection reuse:", registry.stats()["clients"])
+
+    server.should_exit = True
+    await server_task
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,14 +1,25 @@
 # uv run chainlit run main.py -w
+import logging
 import os
 from dotenv import load_dotenv
 from typing import cast
 import chainlit as cl
-from agents import Agent, Runner, AsyncOpenAI, OpenAIChatCompletionsModel
+from agents import Agent
 from agents.run import RunConfig
+from agent_runtime.executor import executor
+from agent_runtime.history import HistoryManager
+from agent_runtime.log_sink import enable_structured_logging
+from agent_runtime.registry import registry
 
 # Load the environment variables from the .env file
 load_dotenv()
 
+# JSON lines from a background thread instead of print(); the context dumps are DEBUG, so
+# they need LOG_LEVEL=DEBUG, and LOG_SAMPLE=chatbot.history=0.1 thins them out
+enable_structured_logging(("chatbot", "agent_runtime"))
+logger = logging.getLogger("chatbot")
+history_logger = logging.getLogger("chatbot.history")
+
 gemini_api_key = os.getenv("GEMINI_API_KEY")
 
 # Check if the API key is present; if not, raise an error
@@ -19,24 +30,20 @@ if not gemini_api_key:
 @cl.on_chat_start
 async def start():
     #Reference: https://ai.google.dev/gemini-api/docs/openai
-    external_client = AsyncOpenAI(
-        api_key=gemini_api_key,
+    # The client and model are built once per process and shared by every session
+    model = registry.model(
+        "gemini-2.0-flash",
         base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-    )
-
-    model = OpenAIChatCompletionsModel(
-        model="gemini-2.0-flash",
-        openai_client=external_client
+        api_key=gemini_api_key,
     )
 
     config = RunConfig(
         model=model,
-        model_provider=external_client,
         tracing_disabled=True
     )
     """Set up the chat session when a user connects."""
-    # Initialize an empty chat history in the session.
-    cl.user_session.set("chat_history", [])
+    # Initialize an empty, token-budgeted chat history in the session.
+    cl.user_session.set("chat_history", HistoryManager(config))
 
     cl.user_session.set("config", config)
     agent: Agent = Agent(name="Assistant", instructions="You are a helpful assistant", model=model)
@@ -55,17 +62,16 @@ async def main(message: cl.Message):
     config: RunConfig = cast(RunConfig, cl.user_session.get("config"))
 
     # Retrieve the chat history from the session.
-    history = cl.user_session.get("chat_history") or []
+    history: HistoryManager = cast(HistoryManager, cl.user_session.get("chat_history"))
     
     # Append the user's message to the history.
     history.append({"role": "user", "content": message.content})
     
 
     try:
-        print("\n[CALLING_AGENT_WITH_CONTEXT]\n", history, "\n")
-        result = Runner.run_sync(starting_agent = agent,
-                    input=history,
-                    run_config=config)
+        turn_input = history.input()
+        history_logger.debug("calling agent with context", extra={"items": len(turn_input), "input": turn_input})
+        result = await executor.run(agent, turn_input, run_config=config)
         
         response_content = result.final_output
         
@@ -73,15 +79,15 @@ async def main(message: cl.Message):
         msg.content = response_content
         await msg.update()
     
-        # Update the session with the new history.
-        cl.user_session.set("chat_history", result.to_input_list())
+        # Add this turn's items; older turns are summarized in the background.
+        history.extend([item.to_input_item() for item in result.new_items])
+        history.compact()
         
         # Optional: Log the interaction
-        print(f"User: {message.content}")
-        print(f"Assistant: {response_content}")
+        logger.info("turn", extra={"user": message.content, "assistant": response_content})
         
     except Exception as e:
         msg.content = f"Error: {str(e)}"
         await msg.update()
-        print(f"Error: {str(e)}")
+        logger.exception("turn failed")
 
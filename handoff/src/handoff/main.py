@@ -5,8 +5,10 @@ from agents.run import RunConfig
 load_dotenv(find_dotenv())
 from agents import function_tool
 from agents import Agent, Runner, AsyncOpenAI, set_default_openai_client, set_tracing_disabled, set_default_openai_api
-from agents import enable_verbose_stdout_logging
-enable_verbose_stdout_logging()
+from agent_runtime.graph import compile_graph
+from agent_runtime.log_sink import enable_structured_logging
+# SDK logs as sampled JSON lines, written by a background thread; LOG_LEVEL=DEBUG for the verbose ones
+enable_structured_logging()
 
 gemini_api_key = os.getenv("GEMINI_API_KEY")
 set_tracing_disabled(True)
@@ -42,6 +44,9 @@ chat_agent: Agent = Agent(name="Assistant",
                      handoffs=[panaversity_agent,agentic_ai_expert]
                      )
 
+# Build the handoffs once and check the graph before the first turn
+chat_agent = compile_graph(chat_agent, [panaversity_agent, agentic_ai_expert]).entry
+
 
 result = Runner.run_sync(starting_agent=chat_agent, input="who is the founder of panaversity")
 
@@ -0,0 +1,75 @@
+# uv run bench_local_memory.py --sizes 1000 10000 100000 1000000
+"""Search latency of the local memory backend from 1k to 1M stored memories.
+
+For each size one user is filled with clustered random unit vectors (real
+memories are topical, not uniform), then queried with noisy copies of stored
+vectors. Exact search and the IVF index are timed separately, and the index's
+recall@k is measured against exact search.
+"""
+import argparse
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+import numpy as np
+
+from local_memory import IVFIndex, UserMemories, top_hits
+
+
+def percentile(values: list[float], pct: float) -> float:
+    return float(np.percentile(values, pct))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=3)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+    topics = rng.standard_normal((2_000, args.dim)).astype(np.float32)
+
+    print(f"{'memories':>10} {'exact p50':>10} {'exact p99':>10} {'ivf p50':>9} {'ivf p99':>9} {'recall':>7} {'build s':>8}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            user = UserMemories(Path(tmp), args.dim, ann_threshold=None)
+            for start in range(0, size, 100_000):
+                count = min(100_000, size - start)
+                vectors = topics[rng.integers(0, len(topics), count)]
+                vectors = vectors + rng.standard_normal((count, args.dim)).astype(np.float32) * 0.6
+                vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+                user.append(vectors, [{"id": str(start + i), "memory": f"memory {start + i}"} for i in range(count)])
+
+            stored = np.asarray(user.vectors)
+            queries = stored[rng.integers(0, size, args.queries)] + rng.standard_normal((args.queries, args.dim)).astype(np.float32) * 0.05
+            queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+            exact_ms, exact_hits = [], []
+            for q in queries:
+                t = perf_counter()
+                hits = user.search(q, args.top_k)
+                [user.record(row) for row, _ in hits]
+                exact_ms.append((perf_counter() - t) * 1000)
+                exact_hits.append({row for row, _ in hits})
+
+            t = perf_counter()
+            index = IVFIndex(stored)
+            build_s = perf_counter() - t
+            ivf_ms, found = [], 0
+            for q, expected in zip(queries, exact_hits):
+                t = perf_counter()
+                hits = top_hits(*index.search(q, args.top_k), args.top_k)
+                [user.record(row) for row, _ in hits]
+                ivf_ms.append((perf_counter() - t) * 1000)
+                found += len(expected & {row for row, _ in hits})
+
+            print(
+                f"{size:>10} {percentile(exact_ms, 50):>9.3f}ms {percentile(exact_ms, 99):>9.3f}ms"
+                f" {percentile(ivf_ms, 50):>7.3f}ms {percentile(ivf_ms, 99):>7.3f}ms"
+                f" {found / (len(queries) * args.top_k):>7.1%} {build_s:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
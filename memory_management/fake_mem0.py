@@ -0,0 +1,37 @@
+import re
+import threading
+from uuid import uuid4
+
+_WORD = re.compile(r"\w+")
+
+
+class InMemoryMemoryClient:
+    """Local stand-in for `mem0.MemoryClient` with the same `search`/`add` calls.
+
+    Memories are ranked by word overlap with the query. Use it to run the example
+    offline with `MEM0_BACKEND=fake`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._memories: dict[str, list[dict]] = {}
+
+    def add(self, messages: list[dict], user_id: str, **kwargs) -> list[dict]:
+        events = []
+        with self._lock:
+            for message in messages:
+                memory = {"id": str(uuid4()), "memory": message["content"], "user_id": user_id}
+                self._memories.setdefault(user_id, []).append(memory)
+                events.append({"id": memory["id"], "event": "ADD", "memory": memory["memory"]})
+        return events
+
+    def search(self, query: str, user_id: str, top_k: int = 10, **kwargs) -> list[dict]:
+        words = set(_WORD.findall(query.lower()))
+        with self._lock:
+            memories = list(self._memories.get(user_id, []))
+        scored = []
+        for memory in memories:
+            overlap = len(words & set(_WORD.findall(memory["memory"].lower())))
+            scored.append({**memory, "score": overlap / (len(words) or 1)})
+        scored.sort(key=lambda m: m["score"], reverse=True)
+        return scored[:top_k]
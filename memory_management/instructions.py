@@ -0,0 +1,148 @@
+import asyncio
+import functools
+import inspect
+import time
+import weakref
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any, Literal
+
+from agents import Agent, RunContextWrapper
+
+InstructionsFunction = Callable[[RunContextWrapper[Any], Agent[Any]], Any]
+
+
+def _field(context: Any, name: str) -> Any:
+    return context.get(name) if isinstance(context, dict) else getattr(context, name, None)
+
+
+class CachedInstructions:
+    """Dynamic instructions computed once per scope instead of on every model turn.
+
+    - `scope="run"`: once per `Runner.run`, however many tool-call turns it takes.
+    - `scope="session"`: shared by every run whose context has the same `key_fields`
+      values, until `ttl` seconds pass (or forever without a ttl). At most
+      `max_entries` are kept, least recently used first out.
+
+    `version(ctx)` is part of the key, so instructions built from data that
+    changes (a user's memories) are rebuilt as soon as its version moves on.
+
+    The cached string is returned as is, so the system prompt stays byte-identical
+    between turns and provider-side prompt caching can hit.
+
+    Use it through `cached_instructions`: the SDK only awaits instructions that are
+    real `async def` functions.
+    """
+
+    def __init__(
+        self,
+        func: InstructionsFunction,
+        scope: Literal["run", "session"] = "run",
+        key_fields: tuple[str, ...] = (),
+        ttl: float | None = None,
+        version: Callable[[RunContextWrapper[Any]], Any] | None = None,
+        max_entries: int = 1024,
+    ):
+        self.func = func
+        self.scope = scope
+        self.key_fields = key_fields
+        self.ttl = ttl
+        self.version = version
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        # Keys are (run id or None, agent name, key_fields values, version)
+        self._entries: OrderedDict[Any, tuple[float, asyncio.Future[str]]] = OrderedDict()
+        self._runs: set[int] = set()
+
+    def _key(self, ctx: RunContextWrapper[Any], agent: Agent[Any]) -> Any:
+        fields = tuple(_field(ctx.context, name) for name in self.key_fields)
+        version = self.version(ctx) if self.version is not None else None
+        if self.scope == "session":
+            return (None, agent.name, fields, version)
+        # The wrapper lives exactly as long as the run; drop its entries with it
+        run_id = id(ctx)
+        if run_id not in self._runs:
+            self._runs.add(run_id)
+            weakref.finalize(ctx, self._drop_run, run_id)
+        return (run_id, agent.name, fields, version)
+
+    def _drop_run(self, run_id: int) -> None:
+        self._runs.discard(run_id)
+        for key in [key for key in self._entries if key[0] == run_id]:
+            del self._entries[key]
+
+    async def _compute(self, ctx: RunContextWrapper[Any], agent: Agent[Any]) -> str:
+        result = self.func(ctx, agent)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    async def get(self, ctx: RunContextWrapper[Any], agent: Agent[Any]) -> str:
+        key = self._key(ctx, agent)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return await asyncio.shield(entry[1])
+
+        self.misses += 1
+        expires = time.monotonic() + self.ttl if self.ttl is not None else float("inf")
+        # Concurrent turns for the same key share the pending computation
+        task = asyncio.ensure_future(self._compute(ctx, agent))
+        self._entries[key] = (expires, task)
+        self._entries.move_to_end(key)
+        self._evict()
+        try:
+            return await asyncio.shield(task)
+        except Exception:
+            self._entries.pop(key, None)
+            raise
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        for key in [key for key, (expires, _) in self._entries.items() if expires <= now]:
+            del self._entries[key]
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, *field_values: Any) -> None:
+        """Forget entries for these `key_fields` values, or everything."""
+        for key in list(self._entries):
+            if not field_values or key[2] == field_values:
+                del self._entries[key]
+
+    def stats(self) -> dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+def cached_instructions(
+    func: InstructionsFunction | None = None,
+    *,
+    scope: Literal["run", "session"] = "run",
+    key_fields: tuple[str, ...] = (),
+    ttl: float | None = None,
+    version: Callable[[RunContextWrapper[Any]], Any] | None = None,
+    max_entries: int = 1024,
+) -> Any:
+    """Wrap an instructions function in a `CachedInstructions`.
+
+    The result is a plain `async def` usable as `Agent(instructions=...)`; the cache
+    itself is available as its `.cache` attribute.
+    """
+
+    def decorator(func: InstructionsFunction) -> Any:
+        cache = CachedInstructions(
+            func, scope=scope, key_fields=key_fields, ttl=ttl, version=version, max_entries=max_entries
+        )
+
+        @functools.wraps(func)
+        async def instructions(ctx: RunContextWrapper[Any], agent: Agent[Any]) -> str:
+            return await cache.get(ctx, agent)
+
+        instructions.cache = cache  # type: ignore[attr-defined]
+        return instructions
+
+    if func is not None:
+        return decorator(func)
+    return decorator
@@ -0,0 +1,237 @@
+import hashlib
+import json
+import re
+import threading
+import zlib
+from collections.abc import Callable
+from pathlib import Path
+from uuid import uuid4
+
+import numpy as np
+
+_WORD = re.compile(r"\w+")
+
+Embedder = Callable[[list[str]], np.ndarray]
+
+
+def hashed_embedder(dim: int) -> Embedder:
+    """Hashed unigram + bigram embedding: local, deterministic and dependency free."""
+
+    def embed(texts: list[str]) -> np.ndarray:
+        out = np.zeros((len(texts), dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = _WORD.findall(text.lower())
+            for gram in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+                h = zlib.crc32(gram.encode())
+                out[row, h % dim] += 1.0 if h & 1 << 31 else -1.0
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return out / np.where(norms == 0, 1, norms)
+
+    return embed
+
+
+class IVFIndex:
+    """Inverted-file index: spherical k-means lists stored contiguously.
+
+    A query scores the centroids, then only the `nprobe` closest lists.
+    """
+
+    def __init__(self, vectors: np.ndarray, nprobe: int = 8, iterations: int = 8, seed: int = 0):
+        n = len(vectors)
+        self.size = n
+        self.nprobe = nprobe
+        nlist = max(1, int(np.sqrt(n)))
+        rng = np.random.default_rng(seed)
+        sample = vectors[rng.choice(n, size=min(n, nlist * 40), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = sample[assign == c]
+                if len(members):
+                    centroids[c] = members.sum(axis=0)
+            centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+        self.centroids = centroids
+
+        assign = np.concatenate([
+            np.argmax(vectors[i:i + 65536] @ centroids.T, axis=1) for i in range(0, n, 65536)
+        ])
+        self.ids = np.argsort(assign, kind="stable")
+        self.vectors = np.ascontiguousarray(vectors[self.ids])
+        self.bounds = np.searchsorted(assign[self.ids], np.arange(nlist + 1))
+
+    def search(self, query: np.ndarray, top_k: int) -> tuple[np.ndarray, np.ndarray]:
+        lists = np.argpartition(-(self.centroids @ query), min(self.nprobe, len(self.centroids)) - 1)
+        ids, scores = [], []
+        for c in lists[: self.nprobe]:
+            lo, hi = self.bounds[c], self.bounds[c + 1]
+            if hi > lo:
+                ids.append(self.ids[lo:hi])
+                scores.append(self.vectors[lo:hi] @ query)
+        if not ids:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        return np.concatenate(ids), np.concatenate(scores)
+
+
+def top_hits(ids: np.ndarray, scores: np.ndarray, top_k: int) -> list[tuple[int, float]]:
+    if len(scores) > top_k:
+        best = np.argpartition(-scores, top_k - 1)[:top_k]
+        ids, scores = ids[best], scores[best]
+    order = np.argsort(-scores)
+    return [(int(ids[i]), float(scores[i])) for i in order]
+
+
+class UserMemories:
+    """One user's memories on disk.
+
+    - `vectors.f32`: float32 embeddings, memory-mapped and grown by doubling.
+    - `memories.jsonl`: the memory records, appended.
+    - `offsets.i64`: byte offset of each record, so row i is one seek away.
+
+    Vectors and records are written before the offset, which is the commit point.
+
+    The IVF index is built on a background thread. Until it is ready, searches
+    keep using the previous index (or exact search) plus an exact scan of the
+    rows it doesn't cover, so a rebuild never stalls a request.
+    """
+
+    def __init__(self, path: Path, dim: int, ann_threshold: int | None):
+        self.dim = dim
+        self.ann_threshold = ann_threshold
+        path.mkdir(parents=True, exist_ok=True)
+        self._vectors_path = path / "vectors.f32"
+        self._records_path = path / "memories.jsonl"
+        self._offsets_path = path / "offsets.i64"
+        self._vectors_path.touch()
+        self._records_path.touch()
+        self._offsets_path.touch()
+        self.offsets = np.fromfile(self._offsets_path, dtype=np.int64).tolist()
+        self._map: np.memmap | None = None
+        self._open_map()
+        self._records = open(self._records_path, "rb")
+        self._index: IVFIndex | None = None
+        self._building: threading.Thread | None = None
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def _open_map(self) -> None:
+        capacity = self._vectors_path.stat().st_size // (self.dim * 4)
+        self._map = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim)) if capacity else None
+
+    def _reserve(self, needed: int) -> None:
+        capacity = 0 if self._map is None else len(self._map)
+        if needed <= capacity:
+            return
+        capacity = max(1024, capacity * 2, needed)
+        if self._map is not None:
+            self._map.flush()
+            self._map = None
+        with open(self._vectors_path, "r+b") as f:
+            f.truncate(capacity * self.dim * 4)
+        self._open_map()
+
+    def append(self, vectors: np.ndarray, records: list[dict]) -> None:
+        start = len(self)
+        self._reserve(start + len(vectors))
+        self._map[start:start + len(vectors)] = vectors
+        offsets = []
+        with open(self._records_path, "ab") as f:
+            for record in records:
+                offsets.append(f.tell())
+                f.write(json.dumps(record).encode() + b"\n")
+        with open(self._offsets_path, "ab") as f:
+            np.asarray(offsets, dtype=np.int64).tofile(f)
+        self.offsets.extend(offsets)
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._map[: len(self)] if self._map is not None else np.empty((0, self.dim), np.float32)
+
+    def record(self, row: int) -> dict:
+        self._records.seek(self.offsets[row])
+        return json.loads(self._records.readline())
+
+    def search(self, query: np.ndarray, top_k: int) -> list[tuple[int, float]]:
+        n = len(self)
+        if n == 0:
+            return []
+        vectors = self.vectors
+        if self.ann_threshold is None or n < self.ann_threshold:
+            return top_hits(np.arange(n), vectors @ query, top_k)
+
+        index = self._index
+        # Rebuild once the unindexed tail is half the size of the index
+        if index is None or n - index.size > index.size // 2:
+            self._rebuild(vectors)
+        if index is None:
+            return top_hits(np.arange(n), vectors @ query, top_k)
+        ids, scores = index.search(query, top_k)
+        if n > index.size:
+            ids = np.concatenate([ids, np.arange(index.size, n)])
+            scores = np.concatenate([scores, vectors[index.size:] @ query])
+        return top_hits(ids, scores, top_k)
+
+    def _rebuild(self, vectors: np.ndarray) -> None:
+        if self._building is not None and self._building.is_alive():
+            return
+
+        def build() -> None:
+            # The rows are only ever appended to, so this view stays valid
+            self._index = IVFIndex(vectors)
+
+        self._building = threading.Thread(target=build, name="ivf-build", daemon=True)
+        self._building.start()
+
+    def wait_for_index(self, timeout: float | None = None) -> None:
+        """Block until a running index build has finished."""
+        if self._building is not None:
+            self._building.join(timeout)
+
+
+class LocalMemoryClient:
+    """Drop-in for `mem0.MemoryClient.search`/`add` backed by local vector files.
+
+    Exact search is a single matrix-vector product over the user's memory-mapped
+    embeddings. Past `ann_threshold` memories an IVF index is built and only the
+    closest lists are scanned. Pass `ann_threshold=None` to always search exactly.
+    """
+
+    def __init__(
+        self,
+        root: str | Path = ".memories",
+        dim: int = 256,
+        embed: Embedder | None = None,
+        ann_threshold: int | None = 50_000,
+    ):
+        self.root = Path(root)
+        self.dim = dim
+        self.embed = embed or hashed_embedder(dim)
+        self.ann_threshold = ann_threshold
+        self._users: dict[str, UserMemories] = {}
+        self._lock = threading.Lock()
+
+    def _user(self, user_id: str) -> UserMemories:
+        with self._lock:
+            if user_id not in self._users:
+                folder = hashlib.sha1(user_id.encode()).hexdigest()[:16]
+                self._users[user_id] = UserMemories(self.root / folder, self.dim, self.ann_threshold)
+            return self._users[user_id]
+
+    def add(self, messages: list[dict], user_id: str, **kwargs) -> list[dict]:
+        texts = [m["content"] for m in messages if m.get("content")]
+        if not texts:
+            return []
+        records = [{"id": str(uuid4()), "memory": text, "user_id": user_id} for text in texts]
+        user = self._user(user_id)
+        vectors = self.embed(texts)
+        with self._lock:
+            user.append(vectors, records)
+        return [{"id": r["id"], "event": "ADD", "memory": r["memory"]} for r in records]
+
+    def search(self, query: str, user_id: str, top_k: int = 10, **kwargs) -> list[dict]:
+        user = self._user(user_id)
+        query_vector = self.embed([query])[0]
+        with self._lock:
+            hits = user.search(query_vector, top_k)
+            return [{**user.record(row), "score": round(score, 4)} for row, score in hits]
@@ -1,10 +1,16 @@
+import asyncio
 import os
 
 from dotenv import load_dotenv, find_dotenv
-from agents import Agent, Runner, AsyncOpenAI, OpenAIChatCompletionsModel, set_tracing_disabled, function_tool, RunContextWrapper
+from agents import Agent, Runner, AsyncOpenAI, OpenAIChatCompletionsModel, OpenAIProvider, set_tracing_disabled, function_tool, RunContextWrapper
 from agents.tool_context import ToolContext
 from dataclasses import dataclass
 from mem0 import MemoryClient
+from fake_mem0 import InMemoryMemoryClient
+from local_memory import LocalMemoryClient
+from memory import AsyncMemory
+from instructions import cached_instructions
+from agent_runtime.prompt_cache import PrefixCacheModel, layered_instructions
 
 @dataclass
 class UserContext:
@@ -17,42 +23,67 @@ os.environ["OPENAI_API_KEY"] = os.getenv("OPENAI_API_KEY")
 
 
 
-mem_client = MemoryClient()
+# MEM0_BACKEND: "hosted" (mem0 platform, default), "local" (vector files on disk) or "fake"
+MEM0_BACKEND = os.getenv("MEM0_BACKEND", "hosted")
+if MEM0_BACKEND == "local":
+    mem_client = LocalMemoryClient(os.getenv("MEM0_LOCAL_PATH", ".memories"))
+elif MEM0_BACKEND == "fake":
+    mem_client = InMemoryMemoryClient()
+else:
+    mem_client = MemoryClient()
+# Keeps the blocking mem0 calls off the event loop, caches profiles and batches saves
+memory = AsyncMemory(mem_client)
 
 # 1. Which LLM Service?
 
 @function_tool
 async def search_user_memory(context: ToolContext[UserContext], query: str):
     """Use this tool to search user memories."""
-    response = mem_client.search(query=query, user_id=context.context.username, top_k=3)
+    response = await memory.search(query=query, user_id=context.context.username, top_k=3)
     return response
 
 @function_tool
 async def save_user_memory(context: ToolContext[UserContext], query: str):
     """Use this tool to save user memories."""
-    response = mem_client.add([{"role": "user", "content": query}], user_id=context.context.username)
+    response = await memory.add([{"role": "user", "content": query}], user_id=context.context.username)
     return response
 
-def dynamic_instructions_generator(context: RunContextWrapper[UserContext], agent: Agent[UserContext]) -> str:
-    response = mem_client.search(query="General Behavior", user_id=context.context.username, top_k=3)
+# Same prompt for a user's whole session until new memories are saved (or the
+# profile cache expires), so the system prompt stays byte-identical across turns
+@cached_instructions(
+    scope="session",
+    key_fields=("username",),
+    ttl=memory.profile_ttl,
+    version=lambda ctx: memory.profile_version(ctx.context.username),
+)
+async def dynamic_instructions_generator(context: RunContextWrapper[UserContext], agent: Agent[UserContext]) -> str:
+    response = await memory.profile(context.context.username)
     print(response)
-    return f"""Helpful Agent that can answer questions. 
-            Use search_user_memory to find information and save_user_memory to remember information.
-            User Past Memories: {response}
-            """
+    # Memories go last so the instructions above stay a shared, cacheable prefix
+    return layered_instructions(
+        """Helpful Agent that can answer questions. 
+            Use search_user_memory to find information and save_user_memory to remember information.""",
+        volatile=f"User Past Memories: {response}",
+    )
     
 
 orchestrator_agent: Agent = Agent(
     name="DeepAgent",
     instructions=dynamic_instructions_generator,
-    model="gpt-5",
+    model=PrefixCacheModel(OpenAIProvider().get_model("gpt-5"), hints="openai"),
     tools=[save_user_memory, search_user_memory],
 )
 
-while True:
-    # Part 1 Requirement Gathering
-    input_text = input("\n [User:] ")
-    if input_text.lower() in ["exit", "quit"]:
-        break
-    res = Runner.run_sync(orchestrator_agent, input_text, context=UserContext(username="Suhaib Shaikh"))
-    print( "\n [AGENT:]" , res.final_output) # requirement_completed, question
\ No newline at end of file
+async def main():
+    while True:
+        # Part 1 Requirement Gathering
+        input_text = await asyncio.to_thread(input, "\n [User:] ")
+        if input_text.lower() in ["exit", "quit"]:
+            break
+        res = await Runner.run(orchestrator_agent, input_text, context=UserContext(username="Suhaib Shaikh"))
+        print( "\n [AGENT:]" , res.final_output) # requirement_completed, question
+    # Write out any memories still waiting in the batch
+    await memory.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any
+
+PROFILE_QUERY = "General Behavior"
+
+logger = logging.getLogger("memory")
+
+
+class AsyncMemory:
+    """Non-blocking front end for a synchronous mem0 `MemoryClient`.
+
+    - `search` runs the blocking client call on a small thread pool instead of the
+      event loop.
+    - `profile` caches the per-user "General Behavior" search for `profile_ttl`
+      seconds, so dynamic instructions don't hit mem0 on every turn. Concurrent
+      misses for the same user share one request.
+    - `add` only queues the messages. A background task coalesces everything queued
+      for a user into one `add` call per batch and refreshes that user's profile.
+      `profile_version` goes up each time, for caches built from the profile.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        profile_ttl: float = 300.0,
+        flush_interval: float = 0.5,
+        batch_size: int = 20,
+        max_workers: int = 4,
+    ):
+        self.client = client
+        self.profile_ttl = profile_ttl
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mem0")
+        self._profiles: dict[str, tuple[float, Any]] = {}
+        self._versions: dict[str, int] = {}
+        self._profile_tasks: dict[str, asyncio.Task[Any]] = {}
+        self._pending: dict[str, list[dict[str, str]]] = {}
+        self._queued = 0
+        self._wakeup = asyncio.Event()
+        self._flusher: asyncio.Task[None] | None = None
+        self._flushing = asyncio.Lock()
+
+    async def _call(self, fn: Any, *args: Any, **kwargs: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, partial(fn, *args, **kwargs))
+
+    async def search(self, query: str, user_id: str, top_k: int = 3) -> Any:
+        return await self._call(self.client.search, query=query, user_id=user_id, top_k=top_k)
+
+    async def profile(self, user_id: str) -> Any:
+        cached = self._profiles.get(user_id)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        task = self._profile_tasks.get(user_id)
+        if task is None:
+            task = asyncio.create_task(self.search(PROFILE_QUERY, user_id))
+            self._profile_tasks[user_id] = task
+            task.add_done_callback(lambda _: self._profile_tasks.pop(user_id, None))
+        profile = await asyncio.shield(task)
+        self._profiles[user_id] = (time.monotonic() + self.profile_ttl, profile)
+        return profile
+
+    def profile_version(self, user_id: str) -> int:
+        return self._versions.get(user_id, 0)
+
+    async def add(self, messages: list[dict[str, str]], user_id: str) -> dict[str, Any]:
+        self._pending.setdefault(user_id, []).extend(messages)
+        self._queued += len(messages)
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_loop())
+        self._wakeup.set()
+        return {"status": "queued", "messages": len(messages)}
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            if self._queued < self.batch_size:
+                await asyncio.sleep(self.flush_interval)
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        async with self._flushing:
+            await self._flush()
+
+    async def _flush(self) -> None:
+        pending, self._pending, self._queued = self._pending, {}, 0
+        results = await asyncio.gather(
+            *(self._call(self.client.add, messages, user_id=user_id) for user_id, messages in pending.items()),
+            return_exceptions=True,
+        )
+        for (user_id, messages), result in zip(pending.items(), results):
+            if isinstance(result, Exception):
+                logger.warning("mem0 add failed for %s, will retry", user_id, exc_info=result)
+                self._pending[user_id] = messages + self._pending.get(user_id, [])
+                self._queued += len(messages)
+                self._wakeup.set()
+            else:
+                # New memories can change the user's profile
+                self._profiles.pop(user_id, None)
+                self._versions[user_id] = self._versions.get(user_id, 0) + 1
+
+    async def close(self, attempts: int = 3) -> None:
+        """Stop the background flusher and write out everything still queued."""
+        # Waiting for the lock lets a flush that is already running finish first
+        async with self._flushing:
+            if self._flusher is not None:
+                self._flusher.cancel()
+            for _ in range(attempts):
+                if not self._pending:
+                    break
+                await self._flush()
+        if self._pending:
+            logger.error("mem0: dropping %d unsaved messages at close", self._queued)
+        self._pool.shutdown(wait=True)
@@ -0,0 +1,56 @@
+import asyncio
+from dataclasses import dataclass
+
+from agents import Agent, RunContextWrapper
+
+from fake_mem0 import InMemoryMemoryClient
+from instructions import cached_instructions
+from memory import AsyncMemory
+
+
+@dataclass
+class UserContext:
+    username: str
+
+
+def test_saved_memories_reach_the_next_prompt():
+    async def scenario():
+        memory = AsyncMemory(InMemoryMemoryClient(), flush_interval=0.01)
+
+        @cached_instructions(
+            scope="session",
+            key_fields=("username",),
+            ttl=300,
+            version=lambda ctx: memory.profile_version(ctx.context.username),
+        )
+        async def instructions(ctx, agent):
+            profile = await memory.profile(ctx.context.username)
+            return " / ".join(m["memory"] for m in profile)
+
+        agent = Agent(name="a")
+        ctx = RunContextWrapper(UserContext("ann"))
+        assert await instructions(ctx, agent) == ""
+        await memory.add([{"role": "user", "content": "General Behavior: terse"}], user_id="ann")
+        await memory.flush()
+        assert await instructions(ctx, agent) == "General Behavior: terse"
+        assert instructions.cache.stats()["misses"] == 2
+        await memory.close()
+
+    asyncio.run(scenario())
+
+
+def test_session_entries_are_bounded():
+    async def scenario():
+        @cached_instructions(scope="session", key_fields=("username",), max_entries=2)
+        async def instructions(ctx, agent):
+            return ctx.context.username
+
+        agent = Agent(name="a")
+        for name in ["ann", "bob", "cy", "ann"]:
+            await instructions(RunContextWrapper(UserContext(name)), agent)
+        stats = instructions.cache.stats()
+        assert stats["entries"] == 2
+        # ann was evicted by cy and computed again
+        assert stats["misses"] == 4
+
+    asyncio.run(scenario())
@@ -0,0 +1,31 @@
+import numpy as np
+
+from local_memory import UserMemories
+
+
+def fill(user: UserMemories, count: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((count, user.dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    user.append(vectors, [{"id": str(i), "memory": f"memory {i}"} for i in range(len(user), len(user) + count)])
+    return vectors
+
+
+def test_search_serves_exact_results_while_the_index_builds(tmp_path):
+    user = UserMemories(tmp_path, dim=16, ann_threshold=100)
+    vectors = fill(user, 400)
+    # The first search past the threshold starts a build but doesn't wait for it
+    hits = user.search(vectors[7], top_k=1)
+    assert hits[0][0] == 7
+    user.wait_for_index()
+    assert user._index is not None and user._index.size == 400
+
+
+def test_rows_added_after_the_build_are_still_found(tmp_path):
+    user = UserMemories(tmp_path, dim=16, ann_threshold=100)
+    fill(user, 400)
+    user.search(np.ones(16, dtype=np.float32) / 4, top_k=1)
+    user.wait_for_index()
+    extra = fill(user, 50, seed=1)
+    hits = user.search(extra[3], top_k=1)
+    assert hits[0][0] == 403
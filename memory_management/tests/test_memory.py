@@ -0,0 +1,96 @@
+import asyncio
+import threading
+
+from fake_mem0 import InMemoryMemoryClient
+from memory import AsyncMemory
+
+
+class RecordingClient(InMemoryMemoryClient):
+    """The in-memory fake, recording calls and failing the first `failures` adds."""
+
+    def __init__(self, failures: int = 0, add_delay: float = 0.0):
+        super().__init__()
+        self.failures = failures
+        self.add_delay = add_delay
+        self.adds: list[tuple[str, int]] = []
+        self.searches = 0
+        self._calls = threading.Lock()
+
+    def add(self, messages, user_id, **kwargs):
+        if self.add_delay:
+            threading.Event().wait(self.add_delay)
+        with self._calls:
+            self.adds.append((user_id, len(messages)))
+            if self.failures:
+                self.failures -= 1
+                raise ConnectionError("mem0 unavailable")
+        return super().add(messages, user_id, **kwargs)
+
+    def search(self, query, user_id, top_k=10, **kwargs):
+        self.searches += 1
+        return super().search(query, user_id, top_k, **kwargs)
+
+
+def message(text: str) -> list[dict[str, str]]:
+    return [{"role": "user", "content": text}]
+
+
+def test_adds_are_batched_per_user():
+    async def scenario():
+        client = RecordingClient()
+        memory = AsyncMemory(client, flush_interval=0.05)
+        results = [await memory.add(message(f"fact {i}"), user_id="ann") for i in range(5)]
+        await memory.add(message("other"), user_id="bob")
+        assert all(r["status"] == "queued" for r in results)
+        assert client.adds == []
+        await asyncio.sleep(0.2)
+        assert sorted(client.adds) == [("ann", 5), ("bob", 1)]
+        await memory.close()
+
+    asyncio.run(scenario())
+
+
+def test_failed_add_is_retried_in_order():
+    async def scenario():
+        client = RecordingClient(failures=1)
+        memory = AsyncMemory(client, flush_interval=0.01)
+        await memory.add(message("first"), user_id="ann")
+        await asyncio.sleep(0.05)
+        await memory.add(message("second"), user_id="ann")
+        await asyncio.sleep(0.1)
+        stored = [m["memory"] for m in client._memories["ann"]]
+        assert stored == ["first", "second"]
+        assert client.adds[0] == ("ann", 1)
+        await memory.close()
+
+    asyncio.run(scenario())
+
+
+def test_saved_memories_invalidate_the_profile():
+    async def scenario():
+        client = RecordingClient()
+        memory = AsyncMemory(client, flush_interval=0.01)
+        assert await memory.profile("ann") == []
+        assert await memory.profile("ann") == []
+        assert client.searches == 1
+        await memory.add(message("General Behavior: likes short answers"), user_id="ann")
+        await memory.flush()
+        profile = await memory.profile("ann")
+        assert client.searches == 2
+        assert profile[0]["memory"] == "General Behavior: likes short answers"
+        await memory.close()
+
+    asyncio.run(scenario())
+
+
+def test_close_waits_for_a_running_flush_and_retries_it():
+    async def scenario():
+        client = RecordingClient(failures=1, add_delay=0.1)
+        memory = AsyncMemory(client, flush_interval=0.0)
+        await memory.add(message("slow"), user_id="ann")
+        await asyncio.sleep(0.02)  # the flusher is now inside the slow add
+        await memory.add(message("queued"), user_id="ann")
+        await memory.close()
+        assert [m["memory"] for m in client._memories["ann"]] == ["slow", "queued"]
+
+    asyncio.run(scenario())
@@ -1,7 +1,8 @@
-from agents import Agent, Runner, set_tracing_disabled, OpenAIChatCompletionsModel
-from agents.extensions.models.litellm_model import LitellmModel
+from agents import Agent, Runner, set_tracing_disabled, OpenAIChatCompletionsModel, ModelSettings
 from openai import AsyncOpenAI
 from dotenv import load_dotenv, find_dotenv
+from agent_runtime.registry import registry
+from agent_runtime.router import HandoffRouter
 import os
 _:bool = load_dotenv(find_dotenv())
 # BASE_URL = "https://generativelanguage.googleapis.com/v1beta/openai/"
@@ -19,14 +20,14 @@ Cloud_Agent = Agent(
     name="Cloud Computing Agent",
     instructions="Specialized Agent to answer queries regarding Cloud computing in the contect of Agentic AI",
     # model=OpenAIChatCompletionsModel(model=MODEL, openai_client=client)
-    model=LitellmModel(model="gemini/gemini-2.0-flash",api_key=GEMINI_API_KEY) 
+    model=registry.litellm_model("gemini/gemini-2.0-flash", api_key=GEMINI_API_KEY) 
 )
 
 OpenAI_agents_sdk_agent = Agent(
     name="Openai agents sdk agent",
     instructions="Specialized Agent to answer queries regarding the Openai agents sdk agentic framework",
     # model=OpenAIChatCompletionsModel(model=MODEL, openai_client=client)
-    model=LitellmModel(model="gemini/gemini-2.0-flash",api_key=GEMINI_API_KEY)
+    model=registry.litellm_model("gemini/gemini-2.0-flash", api_key=GEMINI_API_KEY)
 
 )
 MobileDev_agent = Agent(
@@ -35,7 +36,7 @@ MobileDev_agent = Agent(
                 Handle queries about iOS (Swift), Android (Kotlin/Java), and cross-platform tools like Flutter. Provide detailed guidance, code snippets, and mobile-specific solutions.\
                 Respond only to mobile development-specific queries handed off by the Panaversity agent.",
     # model=OpenAIChatCompletionsModel(model=MODEL, openai_client=client),
-    model=LitellmModel(model="gemini/gemini-2.0-flash",api_key=GEMINI_API_KEY),
+    model=registry.litellm_model("gemini/gemini-2.0-flash", api_key=GEMINI_API_KEY),
     handoff_description="handles all queries regarding MObile Development and it's development"
 )
 
@@ -45,7 +46,7 @@ WebDev_agent = Agent(
                  Handle queries about HTML, CSS, JavaScript, and web frameworks. Provide detailed code examples, best practices, and troubleshooting advice.\
                  Respond only to web development-specific queries handed off by the Panaversity agent.",
     # model=OpenAIChatCompletionsModel(model=MODEL, openai_client=client),
-    model=LitellmModel(model="gemini/gemini-2.0-flash",api_key=GEMINI_API_KEY),
+    model=registry.litellm_model("gemini/gemini-2.0-flash", api_key=GEMINI_API_KEY),
     handoff_description="specialized in handling all queries regarding Web development and it's development"
 )
 
@@ -56,7 +57,7 @@ AgenticAI_Agent = Agent(
                  Use the CloudAgent and OpenAIAgent as tools to assist with cloud-based processing and advanced AI model interactions. \
                  Respond only to agentic AI-specific queries handed off by the Panaversity agent.",
     # model=OpenAIChatCompletionsModel(model=MODEL, openai_client=client),             
-    model=LitellmModel(model="gemini/gemini-2.0-flash",api_key=GEMINI_API_KEY),
+    model=registry.litellm_model("gemini/gemini-2.0-flash", api_key=GEMINI_API_KEY),
     handoff_description="specialized in handling all queries regaring Agentic AI and it's development",
     tools=[
         Cloud_Agent.as_tool(
@@ -67,7 +68,9 @@ AgenticAI_Agent = Agent(
             tool_name="OpenAI_agents_sdk_Agent",
             tool_description="A tool for retrieving information OpenAI agent sdk agentic framework in the field of Agentic AI"
         )
-    ]
+    ],
+    # Lets the model ask both sub-agents in one turn so they run at the same time
+    model_settings=ModelSettings(parallel_tool_calls=True),
 )
 
 
@@ -81,11 +84,20 @@ Panacloud_agent = Agent(
                   For all other queries, provide clear, concise, and educational responses with a teaching tone.",
       handoffs=[WebDev_agent, AgenticAI_Agent, MobileDev_agent],
     #   model=OpenAIChatCompletionsModel(model=MODEL, openai_client=client),
-      model=LitellmModel(model="gemini/gemini-2.0-flash",api_key=GEMINI_API_KEY)
+      model=registry.litellm_model("gemini/gemini-2.0-flash", api_key=GEMINI_API_KEY)
   )
 
-result = Runner.run_sync(starting_agent=Panacloud_agent,
-                         input= "What's the agentic ai in the cloud"
+# Same rules as Panacloud_agent's instructions, so clear-cut queries skip the triage turn.
+# "cloud" alone is left to triage: it only means AgenticAI in the context of AI
+router = HandoffRouter(Panacloud_agent, keywords={
+    WebDev_agent.name: ["web", "html", "css", "javascript"],
+    MobileDev_agent.name: ["mobile", "ios", "android", "flutter"],
+    AgenticAI_Agent.name: ["agentic", "ai agent", "ai agents"],
+})
+
+query = "What's the agentic ai in the cloud"
+result = Runner.run_sync(starting_agent=router.route(query) or Panacloud_agent,
+                         input=query
                          )
 print(result.final_output)
 print(result.last_agent.name)
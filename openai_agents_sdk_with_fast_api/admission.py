@@ -0,0 +1,206 @@
+import asyncio
+import heapq
+import itertools
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Any
+
+
+class Rejected(Exception):
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"{reason}, retry after {retry_after:.1f}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {"Retry-After": str(max(1, math.ceil(self.retry_after)))}
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Take one token; returns 0, or the seconds until one is available."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class Ticket:
+    """A held slot. `release` is idempotent, so it can be called from several places."""
+
+    def __init__(self, controller: "AdmissionController"):
+        self._controller = controller
+        self._released = False
+        self.started = time.monotonic()
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._controller._durations.append(time.monotonic() - self.started)
+            self._controller._release()
+
+    async def __aenter__(self) -> "Ticket":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        self.release()
+
+
+class AdmissionController:
+    """Per-user token buckets in front of a global cap on in-flight requests.
+
+    A request first takes a token from its user's bucket (`user_rate` per second,
+    bursts of `user_burst`); an empty bucket is rejected at once with the time
+    until the next token. Admitted requests run while fewer than `max_in_flight`
+    are running, otherwise they wait in a priority queue (lower number first,
+    FIFO within a priority). A full queue, or a wait longer than `max_wait`, is
+    rejected with an estimated Retry-After.
+
+    Every /chat request is one guardrail, triage and specialist run, so capping
+    requests bounds the model calls that reach the provider.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 32,
+        user_rate: float = 1.0,
+        user_burst: float = 5.0,
+        max_queue: int = 100,
+        max_wait: float = 10.0,
+        max_users: int = 10_000,
+    ):
+        self.max_in_flight = max_in_flight
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.max_users = max_users
+        self.in_flight = 0
+        self._buckets: dict[str, TokenBucket] = {}
+        self._queue: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._order = itertools.count()
+        self._waits: deque[float] = deque(maxlen=1000)
+        self._durations: deque[float] = deque(maxlen=100)
+        self.admitted = 0
+        self.rejected = {"rate_limited": 0, "queue_full": 0, "queue_timeout": 0}
+
+    def _bucket(self, user_id: str) -> TokenBucket:
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            if len(self._buckets) >= self.max_users:
+                # Full buckets carry no state worth keeping
+                now = time.monotonic()
+                for key in [k for k, b in self._buckets.items() if b.tokens + (now - b.updated) * b.rate >= b.burst]:
+                    del self._buckets[key]
+            bucket = self._buckets[user_id] = TokenBucket(self.user_rate, self.user_burst)
+        return bucket
+
+    def _estimated_wait(self) -> float:
+        # Each slot frees up after about the average request duration
+        average = sum(self._durations) / len(self._durations) if self._durations else 1.0
+        return average * (len(self._queue) + 1) / self.max_in_flight
+
+    def _reject(self, reason: str, retry_after: float) -> Rejected:
+        self.rejected[reason] += 1
+        return Rejected(reason, retry_after)
+
+    async def acquire(self, user_id: str, priority: int = 1) -> Ticket:
+        retry_after = self._bucket(user_id).take()
+        if retry_after:
+            raise self._reject("rate_limited", retry_after)
+
+        start = time.monotonic()
+        if self.in_flight >= self.max_in_flight or self._queue:
+            if len(self._queue) >= self.max_queue:
+                raise self._reject("queue_full", self._estimated_wait())
+            waiter = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._queue, (priority, next(self._order), waiter))
+            try:
+                await asyncio.wait_for(asyncio.shield(waiter), self.max_wait)
+            except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+                # Timed out or the client left; hand the slot on if it was
+                # granted in the meantime
+                if waiter.done() and not waiter.cancelled():
+                    self._release()
+                waiter.cancel()
+                if isinstance(e, asyncio.TimeoutError):
+                    raise self._reject("queue_timeout", self._estimated_wait()) from None
+                raise
+        else:
+            self.in_flight += 1
+
+        self._waits.append(time.monotonic() - start)
+        self.admitted += 1
+        return Ticket(self)
+
+    def _release(self) -> None:
+        # The slot goes straight to the next live waiter, so in_flight stays the same
+        while self._queue:
+            _, _, waiter = heapq.heappop(self._queue)
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    @property
+    def queued(self) -> int:
+        """Requests waiting for a slot."""
+        return sum(1 for _, _, w in self._queue if not w.done())
+
+    def stats(self) -> dict[str, Any]:
+        waits = sorted(self._waits)
+
+        def pct(p: float) -> float | None:
+            return round(waits[min(len(waits) - 1, int(len(waits) * p))] * 1000, 1) if waits else None
+
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+            "queue_wait_ms": {"p50": pct(0.5), "p95": pct(0.95), "p99": pct(0.99), "max": pct(1.0)},
+        }
+
+
+class Conversations:
+    """(user, session) pairs the server has answered, most recent last.
+
+    Lets priority come from the server's own record of a conversation being
+    under way instead of from anything the client sends.
+    """
+
+    def __init__(self, max_size: int = 100_000):
+        self.max_size = max_size
+        self._seen: OrderedDict[tuple[str, str], None] = OrderedDict()
+
+    def add(self, user_id: str, session_id: str) -> None:
+        key = (user_id, session_id)
+        self._seen[key] = None
+        self._seen.move_to_end(key)
+        while len(self._seen) > self.max_size:
+            self._seen.popitem(last=False)
+
+    def __contains__(self, key: tuple[str, str]) -> bool:
+        return key in self._seen
+
+
+def admission_from_env() -> AdmissionController:
+    return AdmissionController(
+        max_in_flight=int(os.getenv("MAX_IN_FLIGHT", "32")),
+        user_rate=float(os.getenv("USER_RATE", "1")),
+        user_burst=float(os.getenv("USER_BURST", "5")),
+        max_queue=int(os.getenv("MAX_QUEUE", "100")),
+        max_wait=float(os.getenv("MAX_QUEUE_WAIT", "10")),
+    )
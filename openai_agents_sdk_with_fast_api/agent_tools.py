@@ -0,0 +1,113 @@
+import asyncio
+import itertools
+from collections.abc import AsyncIterator, Callable
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Literal
+
+from agents import Agent, FunctionTool, ItemHelpers, RunContextWrapper, Runner, function_tool
+from agents.stream_events import StreamEvent
+from openai.types.responses import ResponseTextDeltaEvent
+
+# Where agent tools started inside `with_sub_agent_events` send their deltas
+_sink: ContextVar[asyncio.Queue[Any] | None] = ContextVar("agent_tool_sink", default=None)
+_done = object()
+
+
+@dataclass
+class SubAgentEvent:
+    """A text delta from an agent running as a tool of the streamed agent."""
+
+    tool_name: str
+    call: int
+    """Numbers the calls of one tool, so concurrent calls can be told apart."""
+    agent_name: str
+    delta: str
+    type: Literal["sub_agent_event"] = "sub_agent_event"
+
+
+def streaming_agent_tool(
+    agent: Agent[Any],
+    tool_name: str,
+    tool_description: str,
+) -> FunctionTool:
+    """Like `agent.as_tool`, but streams the nested run's text to the parent stream.
+
+    Outside `with_sub_agent_events` it behaves exactly like `as_tool`. The SDK
+    already runs all tool calls of one model turn together, so several agent tools
+    requested at once run concurrently.
+    """
+    calls = itertools.count()
+
+    @function_tool(name_override=tool_name, description_override=tool_description)
+    async def run_agent(context: RunContextWrapper[Any], input: str) -> str:
+        sink = _sink.get()
+        if sink is None:
+            result = await Runner.run(agent, input, context=context.context)
+            return ItemHelpers.text_message_outputs(result.new_items)
+
+        call = next(calls)
+        streamed = Runner.run_streamed(agent, input, context=context.context)
+        try:
+            async for event in streamed.stream_events():
+                if event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
+                    await sink.put(SubAgentEvent(tool_name, call, streamed.current_agent.name, event.data.delta))
+        finally:
+            if not streamed.is_complete:
+                streamed.cancel()
+        return ItemHelpers.text_message_outputs(streamed.new_items)
+
+    return run_agent
+
+
+async def with_sub_agent_events(
+    start: Callable[[], AsyncIterator[StreamEvent]],
+    max_buffered: int = 64,
+) -> AsyncIterator[StreamEvent | SubAgentEvent]:
+    """Merge the events of `start()` with deltas of agent tools it calls.
+
+    Sub-agent events are held back until the parent stream has yielded its first
+    event, so nothing leaks out while input guardrails are still deciding. At most
+    `max_buffered` events wait for the consumer; past that the parent stream and
+    the agent tools wait too, so a slow client slows the run down instead of
+    piling up events in memory.
+    """
+    queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=max_buffered)
+
+    async def pump() -> None:
+        try:
+            async for event in start():
+                await queue.put(("parent", event))
+            await queue.put(("parent", _done))
+        except Exception as e:
+            await queue.put(("error", e))
+
+    # The pump task gets a copy of this context, and with it the sink
+    token = _sink.set(queue)
+    try:
+        task = asyncio.create_task(pump())
+    finally:
+        _sink.reset(token)
+
+    held: list[SubAgentEvent] | None = []
+    try:
+        while True:
+            item = await queue.get()
+            if isinstance(item, SubAgentEvent):
+                if held is None:
+                    yield item
+                else:
+                    held.append(item)
+                continue
+            kind, value = item
+            if kind == "error":
+                raise value
+            if value is _done:
+                break
+            if held:
+                for event in held:
+                    yield event
+            held = None
+            yield value
+    finally:
+        task.cancel()
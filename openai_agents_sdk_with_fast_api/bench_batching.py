@@ -0,0 +1,139 @@
+# uv run bench_batching.py --requests 200 --concurrency 64 --max-concurrency 8
+"""Throughput of the guardrail classifier with and without request batching.
+
+Runs the guardrail agent on a mix of relevant and off-topic questions against
+fake_openai.py (started here), first with one model request per check and then
+through BatchingModel, and reports latency, throughput and the model requests
+sent. `--max-concurrency` caps the requests the fake serves at once, like a
+provider's concurrency limit, which is where batching pays off.
+
+Every verdict is checked against the one expected for its own input, so an
+answer handed to the wrong caller fails the run.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from statistics import quantiles
+from typing import Any
+
+# main.py builds its client on import
+os.environ.setdefault("GEMINI_API_KEY", "unused")
+
+from agents import Model, ModelResponse, Runner
+
+import main
+from batching import BatchingModel
+
+HERE = Path(__file__).parent
+QUESTIONS = [
+    ("How do I publish a mobile app to the store?", True),
+    ("Give me a cooking recipe for pasta", False),
+    ("What is the OpenAI agents sdk?", True),
+    ("Who won the football match last night?", False),
+    ("How do I deploy an agent to the cloud?", True),
+]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--max-batch", type=int, default=16)
+    parser.add_argument("--max-wait-ms", type=float, default=5)
+    parser.add_argument("--ttft-ms", type=float, default=200)
+    parser.add_argument("--tokens-per-sec", type=float, default=100)
+    parser.add_argument("--max-concurrency", type=int, default=8, help="requests the fake serves at once")
+    return parser.parse_args()
+
+
+class CountingModel(Model):
+    """Counts the requests that actually reach the provider."""
+
+    def __init__(self, inner: Model):
+        self.inner = inner
+        self.requests = 0
+
+    async def get_response(self, *args: Any, **kwargs: Any) -> ModelResponse:
+        self.requests += 1
+        return await self.inner.get_response(*args, **kwargs)
+
+    def stream_response(self, *args: Any, **kwargs: Any) -> Any:
+        return self.inner.stream_response(*args, **kwargs)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_fake_server(args: argparse.Namespace) -> tuple[subprocess.Popen, str]:
+    port = free_port()
+    server = subprocess.Popen([
+        sys.executable, str(HERE / "fake_openai.py"), "--port", str(port),
+        "--ttft-ms", str(args.ttft_ms), "--tokens-per-sec", str(args.tokens_per_sec),
+        "--max-concurrency", str(args.max_concurrency),
+    ])
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            break
+        except OSError:
+            time.sleep(0.1)
+    return server, f"http://127.0.0.1:{port}/v1/"
+
+
+async def bench(args: argparse.Namespace, max_batch: int) -> dict[str, Any]:
+    counter = CountingModel(main.chat_model())
+    model = BatchingModel(counter, max_batch=max_batch, max_wait=args.max_wait_ms / 1000)
+    agent = main.guardrail_agent.clone(model=model)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies: list[float] = []
+    wrong = 0
+
+    async def one(i: int) -> None:
+        nonlocal wrong
+        text, relevant = QUESTIONS[i % len(QUESTIONS)]
+        async with semaphore:
+            start = time.perf_counter()
+            result = await Runner.run(agent, text)
+            latencies.append(time.perf_counter() - start)
+        if result.final_output.is_relevant_input != relevant:
+            wrong += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.requests)))
+    wall = time.perf_counter() - start
+
+    cuts = quantiles(sorted(latencies), n=100, method="inclusive")
+    return {
+        "p50_ms": round(cuts[49] * 1000, 1),
+        "p99_ms": round(cuts[98] * 1000, 1),
+        "throughput_rps": round(args.requests / wall, 1),
+        "model_requests": counter.requests,
+        "wrong_verdicts": wrong,
+        **({"batching": model.stats.summary()} if max_batch > 1 else {}),
+    }
+
+
+async def run(args: argparse.Namespace) -> int:
+    server, main.client.base_url = start_fake_server(args)
+    try:
+        failed = False
+        for label, max_batch in (("unbatched", 1), ("batched", args.max_batch)):
+            report = await bench(args, max_batch)
+            print(f"{label:<10} " + "  ".join(f"{k}={v}" for k, v in report.items()))
+            failed |= report["wrong_verdicts"] > 0
+    finally:
+        server.terminate()
+        server.wait()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(run(parse_args())))
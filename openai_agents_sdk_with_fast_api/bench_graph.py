@@ -0,0 +1,70 @@
+# uv run bench_graph.py
+"""Per-turn overhead of preparing a model call, before and after compile_graph.
+
+Times what the runner does for the current agent before each model request:
+collecting handoffs, tools and the system prompt, then converting tools and
+handoffs to Chat Completions tool params. No requests are sent.
+"""
+import argparse
+import asyncio
+import os
+from time import perf_counter
+
+os.environ.setdefault("GEMINI_API_KEY", "unused")
+
+from agents import Agent, RunContextWrapper
+from agents.run import AgentRunner
+from agents.models.chatcmpl_converter import Converter
+
+import main
+from agent_runtime.graph import compile_graph
+
+
+async def prepare_turn(agent: Agent, ctx: RunContextWrapper) -> int:
+    handoffs = await AgentRunner._get_handoffs(agent, ctx)
+    tools = await agent.get_all_tools(ctx)
+    await agent.get_system_prompt(ctx)
+    converted = [Converter.tool_to_openai(tool) for tool in tools]
+    converted += [Converter.convert_handoff_tool(h) for h in handoffs]
+    return len(converted)
+
+
+async def per_turn_us(agent: Agent, turns: int) -> float:
+    ctx = RunContextWrapper(context=None)
+    await prepare_turn(agent, ctx)
+    start = perf_counter()
+    for _ in range(turns):
+        await prepare_turn(agent, ctx)
+    return (perf_counter() - start) / turns * 1e6
+
+
+async def run(turns: int, rounds: int) -> None:
+    graph = compile_graph(main.Panacloud_agent)
+    print(graph.describe())
+    print(f"{'agent':<28} {'before us':>10} {'after us':>10}")
+    for name, compiled in graph.agents.items():
+        # Alternate the two and keep the best round, so warm-up and noise don't
+        # favour whichever runs second
+        before, after = float("inf"), float("inf")
+        for _ in range(rounds):
+            before = min(before, await per_turn_us(original(name), turns))
+            after = min(after, await per_turn_us(compiled, turns))
+        print(f"{name:<28} {before:>10.1f} {after:>10.1f}")
+
+
+def original(name: str) -> Agent:
+    stack = [main.Panacloud_agent]
+    while stack:
+        agent = stack.pop()
+        if agent.name == name:
+            return agent
+        stack.extend(h for h in agent.handoffs if isinstance(h, Agent))
+    raise KeyError(name)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=20_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run(args.turns, args.rounds))
@@ -0,0 +1,223 @@
+# uv run bench_latency.py --provider fake --record   (once, records bench_cassette.jsonl)
+# uv run bench_latency.py --save-baseline bench_baseline.json
+# uv run bench_latency.py --baseline bench_baseline.json
+"""End-to-end latency of the chat service's agent graph, without a provider.
+
+Each scenario takes one path through the graph: triage answering itself, a
+triage handoff, a keyword-routed specialist, agents-as-tools, a blocked
+guardrail, and /chat/ and /chat/stream through the ASGI app.
+
+Providers:
+
+- `replay` (default): models answer from a cassette recorded earlier, at once.
+  What is left is framework time: the runner, guardrails, handoffs, tools,
+  sessions and the HTTP layer.
+- `fake`: models talk to fake_openai.py (started here unless `--base-url` is
+  given) with the configured latency and token rate. `--record` rewrites the
+  cassette from these runs.
+
+Reports p50/p99 latency, throughput, and the time outside model calls per
+model call ("overhead"). With `--baseline`, exits with status 1 when a
+scenario's p50 or overhead got worse than the baseline by more than
+`--tolerance` (and by more than `--slack-ms`, to ignore noise on tiny values).
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from statistics import quantiles
+
+HERE = Path(__file__).parent
+CASSETTE = HERE / "bench_cassette.jsonl"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--provider", choices=["replay", "fake"], default="replay")
+    parser.add_argument("--record", action="store_true", help="rewrite the cassette (fake provider only)")
+    parser.add_argument("--cassette", type=Path, default=CASSETTE)
+    parser.add_argument("--base-url", help="an already running fake or real OpenAI-compatible server")
+    parser.add_argument("--ttft-ms", type=float, default=200)
+    parser.add_argument("--tokens-per-sec", type=float, default=100)
+    parser.add_argument("--requests", type=int, default=50, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--scenario", action="append", help="run only these scenarios")
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--save-baseline", type=Path)
+    parser.add_argument("--tolerance", type=float, default=0.3)
+    parser.add_argument("--slack-ms", type=float, default=3.0)
+    return parser.parse_args()
+
+
+args = parse_args()
+
+# main.py builds its models on import, so the provider is chosen first
+os.environ.setdefault("GEMINI_API_KEY", "unused")
+os.environ["MODEL_CASSETTE"] = str(args.cassette)
+if args.provider == "replay":
+    if not args.cassette.exists():
+        sys.exit(f"{args.cassette} does not exist; record it with --provider fake --record")
+    os.environ["MODEL_CASSETTE_MODE"] = "replay"
+else:
+    if args.record:
+        args.cassette.unlink(missing_ok=True)
+    os.environ["MODEL_CASSETTE_MODE"] = "record" if args.record else "live"
+# Which guardrail checks share a batch depends on timing, so batched prompts
+# would never match the cassette; bench_batching.py measures batching instead
+os.environ["GUARDRAIL_BATCH_MAX"] = "1"
+
+import httpx
+from agents import InputGuardrailTripwireTriggered
+
+import main
+from prefilter import PrefilterChain
+from replay import ModelTime, model_time
+from speculative import run_speculative
+
+# No local stages: the learned stage would change which requests reach the
+# guardrail model as it trains, and replay needs the same requests every run
+main.prefilter = PrefilterChain([])
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_fake_server() -> tuple[subprocess.Popen, str]:
+    port = free_port()
+    server = subprocess.Popen([
+        sys.executable, str(HERE / "fake_openai.py"), "--port", str(port),
+        "--ttft-ms", str(args.ttft_ms), "--tokens-per-sec", str(args.tokens_per_sec),
+    ])
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            break
+        except OSError:
+            time.sleep(0.1)
+    return server, f"http://127.0.0.1:{port}/v1/"
+
+
+async def agent_run(text: str, routed: bool = False) -> None:
+    agent = (main.router.route(text) if routed else None) or main.graph.entry
+    await run_speculative(agent, [{"role": "user", "content": text}])
+
+
+async def blocked(text: str) -> None:
+    try:
+        await run_speculative(main.graph.entry, [{"role": "user", "content": text}])
+    except InputGuardrailTripwireTriggered:
+        return
+    raise AssertionError("the guardrail should have blocked this")
+
+
+def http_run(path: str, text: str) -> Callable[[httpx.AsyncClient, int], Awaitable[None]]:
+    async def run(client: httpx.AsyncClient, i: int) -> None:
+        # A user per request, so the per-user rate limit stays out of the way
+        response = await client.post(path, json={"user_id": f"bench-{i}", "text": text})
+        response.raise_for_status()
+        await response.aread()
+
+    return run
+
+
+SCENARIOS: dict[str, Callable[[httpx.AsyncClient, int], Awaitable[None]]] = {
+    "triage": lambda c, i: agent_run("What is a good way to learn programming?"),
+    "handoff": lambda c, i: agent_run("How do I build a web page layout?"),
+    "routed": lambda c, i: agent_run("How do I build a web page layout?", routed=True),
+    "agents_as_tools": lambda c, i: agent_run("How should I design an AI agent for the cloud?", routed=True),
+    "guardrail_blocked": lambda c, i: blocked("Give me a cooking recipe for pasta"),
+    "http_chat": http_run("/chat/", "What is a good way to learn programming?"),
+    "http_stream": http_run("/chat/stream", "What is a good way to learn programming?"),
+}
+
+
+async def timed(run: Callable[[], Awaitable[None]]) -> tuple[float, ModelTime]:
+    timer = ModelTime()
+    token = model_time.set(timer)
+    start = time.perf_counter()
+    try:
+        await run()
+    finally:
+        model_time.reset(token)
+    return time.perf_counter() - start, timer
+
+
+async def bench(name: str, client: httpx.AsyncClient) -> dict[str, float]:
+    scenario = SCENARIOS[name]
+    await timed(lambda: scenario(client, -1))  # warm-up
+    semaphore = asyncio.Semaphore(args.concurrency)
+    results: list[tuple[float, ModelTime]] = []
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            results.append(await timed(lambda: scenario(client, i)))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.requests)))
+    wall = time.perf_counter() - start
+
+    latencies = sorted(latency for latency, _ in results)
+    cuts = quantiles(latencies, n=100, method="inclusive")
+    calls = sum(timer.calls for _, timer in results)
+    outside = sum(latency - timer.busy for latency, timer in results)
+    return {
+        "p50_ms": round(cuts[49] * 1000, 3),
+        "p99_ms": round(cuts[98] * 1000, 3),
+        "throughput_rps": round(args.requests / wall, 1),
+        "model_calls": round(calls / len(results), 2),
+        "overhead_ms": round(outside / max(calls, 1) * 1000, 3),
+    }
+
+
+def regressions(report: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]]) -> list[str]:
+    found = []
+    for name, result in report.items():
+        if name not in baseline:
+            continue
+        for metric in ("p50_ms", "overhead_ms"):
+            old, new = baseline[name][metric], result[metric]
+            if new > old * (1 + args.tolerance) and new - old > args.slack_ms:
+                found.append(f"{name}.{metric}: {old} -> {new} ms")
+    return found
+
+
+async def run() -> int:
+    server = None
+    if args.provider == "fake":
+        base_url = args.base_url
+        if base_url is None:
+            server, base_url = start_fake_server()
+        main.client.base_url = base_url
+    try:
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            report = {}
+            for name in args.scenario or SCENARIOS:
+                report[name] = await bench(name, client)
+                print(f"{name:<18} " + "  ".join(f"{k}={v}" for k, v in report[name].items()))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(report, indent=2))
+    if args.baseline:
+        found = regressions(report, json.loads(args.baseline.read_text()))
+        for line in found:
+            print(f"REGRESSION {line}")
+        return 1 if found else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(run()))
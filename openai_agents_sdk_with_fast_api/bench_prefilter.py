@@ -0,0 +1,67 @@
+# uv run bench_prefilter.py --passes 5
+"""Replays a recorded guardrail corpus through the local prefilter.
+
+Each line of the corpus is `{"text": ..., "is_relevant_input": ...}` as returned by
+the guardrail LLM. Inputs the prefilter can't decide are counted as LLM calls and
+their recorded verdict is fed back, the same way `guard` does in main.py.
+The keyword stage accepts inputs as in main.py; `--accept` lets every stage
+accept (PREFILTER_ACCEPT=1 in main.py);
+false accepts are off-topic inputs that would skip the guardrail LLM.
+"""
+import argparse
+import json
+import random
+from pathlib import Path
+from time import perf_counter
+
+from prefilter import KeywordPrefilter, LinearPrefilter, PrefilterChain
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", default=Path(__file__).with_name("prefilter_corpus.jsonl"))
+    parser.add_argument("--passes", type=int, default=5)
+    parser.add_argument("--llm-ms", type=float, default=600.0, help="assumed guardrail LLM latency")
+    parser.add_argument("--min-examples", type=int, default=100)
+    parser.add_argument("--accept", action="store_true", help="let every local stage accept inputs")
+    args = parser.parse_args()
+
+    corpus = [json.loads(line) for line in Path(args.corpus).read_text().splitlines() if line]
+    chain = PrefilterChain([KeywordPrefilter(), LinearPrefilter(min_examples=args.min_examples)], accept=args.accept)
+    rng = random.Random(0)
+
+    added_ms: list[float] = []
+    agree = disagree = false_accepts = 0
+    for _ in range(args.passes):
+        rng.shuffle(corpus)
+        for row in corpus:
+            start = perf_counter()
+            verdict = chain.classify(row["text"])
+            added_ms.append((perf_counter() - start) * 1000)
+            if verdict is None:
+                chain.observe(row["text"], row["is_relevant_input"])
+            elif verdict.is_relevant_input == row["is_relevant_input"]:
+                agree += 1
+            else:
+                disagree += 1
+                false_accepts += verdict.is_relevant_input
+
+    stats = chain.stats()
+    local = agree + disagree
+    print(f"queries:            {stats['requests']} ({len(corpus)} x {args.passes} passes)")
+    print(f"llm call rate:      {stats['llm_call_rate']:.1%}")
+    print(f"local agreement:    {agree / local:.1%} of {local}" if local else "local agreement:    n/a")
+    print(f"false accepts:      {false_accepts}")
+    print(f"added latency p50:  {percentile(added_ms, 50):.3f} ms")
+    print(f"added latency p99:  {percentile(added_ms, 99):.3f} ms")
+    saved = stats["local_verdicts"] * args.llm_ms - sum(added_ms)
+    print(f"guardrail time saved at {args.llm_ms:.0f} ms/call: {saved / 1000:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# uv run bench_structured.py --string-tokens 30
+"""Cost of structured output on the guardrail check, before and after.
+
+1. Parsing: what the runner spends per check getting the output schema and
+   validating the answer, for a plain `output_type=Input` (schema rebuilt every
+   turn) and for `StructuredOutput(Input)` (built once). No model involved.
+2. Time to decision: a full guardrail run against fake_openai.py (started
+   here) versus `run_until`, which stops once `is_relevant_input` is out.
+   `--string-tokens` sets the length of the reasoning the fake writes after it.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from statistics import median
+
+# main.py builds its client on import
+os.environ.setdefault("GEMINI_API_KEY", "unused")
+os.environ["GUARDRAIL_BATCH_MAX"] = "1"
+
+from agents import Runner
+from agents.run import AgentRunner
+
+import main
+from structured_output import StructuredOutput, run_until
+
+HERE = Path(__file__).parent
+QUESTIONS = [
+    ("What is the OpenAI agents sdk?", True),
+    ("Give me a cooking recipe for pasta", False),
+]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--parses", type=int, default=2000)
+    parser.add_argument("--runs", type=int, default=20, help="guardrail runs per mode")
+    parser.add_argument("--ttft-ms", type=float, default=200)
+    parser.add_argument("--tokens-per-sec", type=float, default=100)
+    parser.add_argument("--string-tokens", type=int, default=30)
+    return parser.parse_args()
+
+
+def bench_parsing(parses: int) -> None:
+    answer = json.dumps({"is_relevant_input": True, "reasoning": "fake " * 30})
+    for label, output_type in (("plain", main.Input), ("structured", StructuredOutput(main.Input))):
+        agent = main.guardrail_agent.clone(output_type=output_type)
+        start = time.perf_counter()
+        for _ in range(parses):
+            AgentRunner._get_output_schema(agent).validate_json(answer)
+        per_check = (time.perf_counter() - start) / parses
+        print(f"parse {label:<11} {per_check * 1e6:.1f} us/check")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_fake_server(args: argparse.Namespace) -> tuple[subprocess.Popen, str]:
+    port = free_port()
+    server = subprocess.Popen([
+        sys.executable, str(HERE / "fake_openai.py"), "--port", str(port),
+        "--ttft-ms", str(args.ttft_ms), "--tokens-per-sec", str(args.tokens_per_sec),
+        "--string-tokens", str(args.string_tokens),
+    ])
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            break
+        except OSError:
+            time.sleep(0.1)
+    return server, f"http://127.0.0.1:{port}/v1/"
+
+
+async def full(text: str) -> bool:
+    result = await Runner.run(main.guardrail_agent, text)
+    return result.final_output.is_relevant_input
+
+
+async def early(text: str) -> bool:
+    relevant, _ = await run_until(main.guardrail_agent, text, "is_relevant_input")
+    return relevant
+
+
+async def bench_decision(args: argparse.Namespace) -> bool:
+    server, main.client.base_url = start_fake_server(args)
+    ok = True
+    try:
+        for label, check in (("full", full), ("run_until", early)):
+            latencies = []
+            for i in range(args.runs):
+                text, relevant = QUESTIONS[i % len(QUESTIONS)]
+                start = time.perf_counter()
+                verdict = await check(text)
+                latencies.append(time.perf_counter() - start)
+                ok &= verdict == relevant
+            print(f"decide {label:<10} p50={median(latencies) * 1000:.1f} ms  max={max(latencies) * 1000:.1f} ms")
+    finally:
+        server.terminate()
+        server.wait()
+    return ok
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    bench_parsing(args.parses)
+    if not asyncio.run(bench_decision(args)):
+        sys.exit("a verdict did not match its question")
@@ -0,0 +1,178 @@
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+from agents import Agent, Handoff
+
+Embedder = Callable[[str], Awaitable[list[float]]]
+
+logger = logging.getLogger("chat.cache")
+
+
+def graph_version(agent: Agent[Any]) -> str:
+    """Hash of everything in the agent graph that shapes a reply.
+
+    Editing any agent's instructions, handoffs, tools or model changes the version,
+    so replies cached for the old graph are never served.
+    """
+    seen: dict[str, Any] = {}
+
+    def visit(agent: Agent[Any]) -> None:
+        if agent.name in seen:
+            return
+        seen[agent.name] = {
+            "instructions": agent.instructions if isinstance(agent.instructions, str) else repr(agent.instructions),
+            "handoff_description": agent.handoff_description,
+            "model": agent.model if isinstance(agent.model, str) else getattr(agent.model, "model", repr(agent.model)),
+            "tools": [tool.name for tool in agent.tools],
+            "handoffs": [h.agent_name if isinstance(h, Handoff) else h.name for h in agent.handoffs],
+            "output_type": getattr(agent.output_type, "__name__", None),
+        }
+        for h in agent.handoffs:
+            if isinstance(h, Agent):
+                visit(h)
+
+    visit(agent)
+    return hashlib.sha256(json.dumps(seen, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+@dataclass
+class CacheEntry:
+    reply: str
+    agent_name: str
+    expires: float
+    row: int
+
+
+@dataclass
+class CacheLookup:
+    key: str
+    embedding: np.ndarray | None = None
+    entry: CacheEntry | None = None
+    tier: str | None = None
+    """"exact" or "semantic" on a hit."""
+
+
+class ResponseCache:
+    """Two-tier reply cache: exact text hash, then cosine similarity of embeddings.
+
+    Embeddings live in one preallocated, L2-normalised NumPy matrix and are searched
+    by brute force (a single matrix-vector product); the `top_k` best rows over
+    `threshold` are tried in order, so an expired best match doesn't hide a live
+    runner-up. Entries expire after `ttl` seconds and the least recently used entry
+    is evicted once `capacity` is reached. Keys include the agent graph version.
+
+    A semantic hit answers a different text than the one that was checked, so
+    callers must run the input guardrails on it before serving the reply.
+    """
+
+    def __init__(
+        self,
+        version: str,
+        embed: Embedder | None = None,
+        threshold: float = 0.92,
+        ttl: float = 3600.0,
+        capacity: int = 10_000,
+        top_k: int = 8,
+    ):
+        self.version = version
+        self.embed = embed
+        self.threshold = threshold
+        self.ttl = ttl
+        self.capacity = capacity
+        self.top_k = top_k
+        self.hits = {"exact": 0, "semantic": 0}
+        self.misses = 0
+        self.rejected = 0
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._matrix: np.ndarray | None = None
+        self._row_keys: list[str | None] = [None] * capacity
+        self._free_rows = list(range(capacity - 1, -1, -1))
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.version}\0{normalize(text)}".encode()).hexdigest()
+
+    def _evict(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._row_keys[entry.row] = None
+        if self._matrix is not None:
+            self._matrix[entry.row] = 0.0
+        self._free_rows.append(entry.row)
+
+    def _live(self, key: str) -> CacheEntry | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires < time.monotonic():
+            self._evict(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    async def _embed(self, text: str) -> np.ndarray | None:
+        if self.embed is None:
+            return None
+        try:
+            vector = np.asarray(await self.embed(normalize(text)), dtype=np.float32)
+        except Exception as e:
+            logger.warning("embedding failed, semantic cache skipped", exc_info=e)
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    async def lookup(self, text: str) -> CacheLookup:
+        lookup = CacheLookup(key=self._key(text))
+        if entry := self._live(lookup.key):
+            lookup.entry, lookup.tier = entry, "exact"
+            self.hits["exact"] += 1
+            return lookup
+
+        lookup.embedding = await self._embed(text)
+        if lookup.embedding is not None and self._matrix is not None and self._entries:
+            if lookup.embedding.shape[0] == self._matrix.shape[1]:
+                scores = self._matrix @ lookup.embedding
+                k = min(self.top_k, len(scores))
+                rows = np.argpartition(scores, -k)[-k:]
+                for row in rows[np.argsort(scores[rows])[::-1]]:
+                    if scores[row] < self.threshold:
+                        break
+                    key = self._row_keys[row]
+                    if key is not None and (entry := self._live(key)):
+                        lookup.entry, lookup.tier = entry, "semantic"
+                        self.hits["semantic"] += 1
+                        return lookup
+        self.misses += 1
+        return lookup
+
+    def store(self, lookup: CacheLookup, reply: str, agent_name: str) -> None:
+        if lookup.key in self._entries:
+            self._evict(lookup.key)
+        while not self._free_rows:
+            self._evict(next(iter(self._entries)))
+        row = self._free_rows.pop()
+        self._entries[lookup.key] = CacheEntry(reply, agent_name, time.monotonic() + self.ttl, row)
+        self._row_keys[row] = lookup.key
+        if lookup.embedding is not None:
+            if self._matrix is None:
+                self._matrix = np.zeros((self.capacity, lookup.embedding.shape[0]), dtype=np.float32)
+            if lookup.embedding.shape[0] == self._matrix.shape[1]:
+                self._matrix[row] = lookup.embedding
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "version": self.version,
+            "entries": len(self._entries),
+            "hits": dict(self.hits),
+            "misses": self.misses,
+            "guardrail_rejected": self.rejected,
+        }
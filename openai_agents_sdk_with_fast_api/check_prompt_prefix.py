@@ -0,0 +1,106 @@
+# uv run check_prompt_prefix.py
+"""Checks that the prompt prefix stays stable across the turns of a conversation.
+
+No requests leave the machine: the OpenAI client is given a mock transport that
+records every request body and answers with a canned reply. The mock also plays
+provider cache: it reports as cached the part of the prompt it has already seen
+(in 128-token blocks, about 4 characters per token).
+
+Two agents are checked over several turns, with history carried over like
+/chat does: Panacloud_agent as deployed, and a copy whose instructions end with
+a volatile part (the current time). The copy is run once through
+PrefixCacheModel and once with the volatile text left inside the system prompt,
+to show the difference. Exits with status 1 if a prefix breaks.
+"""
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime
+
+import httpx
+
+os.environ.setdefault("GEMINI_API_KEY", "unused")
+
+from agents import Agent, OpenAIChatCompletionsModel, Runner
+
+import main
+from agent_runtime.prompt_cache import PrefixCacheModel, layered_instructions, stats
+
+TURNS = ["What is an AI agent?", "How do handoffs work?", "And guardrails?", "Give me an example."]
+seen: list[str] = []
+requests: list[dict] = []
+
+
+def serialized(body: dict) -> str:
+    return json.dumps([body.get("tools"), body["messages"]], sort_keys=True)
+
+
+def reply(request: httpx.Request) -> httpx.Response:
+    body = json.loads(request.content)
+    prompt = serialized(body)
+    common = max((len(os.path.commonprefix([prompt, old])) for old in seen), default=0)
+    seen.append(prompt)
+    requests.append(body)
+    content = '{"is_relevant_input": true, "reasoning": "ok"}' if body.get("response_format") else "An answer."
+    tokens = len(prompt) // 4
+    return httpx.Response(200, json={
+        "id": "mock", "object": "chat.completion", "created": 0, "model": body["model"],
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+        "usage": {
+            "prompt_tokens": tokens, "completion_tokens": 3, "total_tokens": tokens + 3,
+            "prompt_tokens_details": {"cached_tokens": common // 4 // 128 * 128},
+        },
+    })
+
+
+def volatile_instructions(ctx, agent) -> str:
+    return layered_instructions(main.Panacloud_agent.instructions, volatile=f"Current time: {datetime.now().isoformat()}")
+
+
+def naive_instructions(ctx, agent) -> str:
+    return f"Current time: {datetime.now().isoformat()}\n{main.Panacloud_agent.instructions}"
+
+
+async def conversation(agent: Agent) -> list[dict]:
+    start = len(requests)
+    history: list = []
+    for text in TURNS:
+        result = await Runner.run(agent, history + [{"role": "user", "content": text}])
+        history = result.to_input_list()
+        await asyncio.sleep(0.01)
+    # Only the agent's own requests, not the guardrail's
+    return [body for body in requests[start:] if not body.get("response_format")]
+
+
+def stable_prefix(bodies: list[dict], volatile_tail: bool) -> bool:
+    ok = True
+    for turn, (previous, current) in enumerate(zip(bodies, bodies[1:]), start=2):
+        messages = previous["messages"][:-1] if volatile_tail else previous["messages"]
+        same = previous.get("tools") == current.get("tools") and current["messages"][: len(messages)] == messages
+        print(f"  turn {turn}: {'prefix kept' if same else 'PREFIX CHANGED'}")
+        ok &= same
+    return ok
+
+
+async def run() -> int:
+    main.client._client = httpx.AsyncClient(transport=httpx.MockTransport(reply))
+    model = OpenAIChatCompletionsModel(model=main.MODEL, openai_client=main.client)
+
+    print("Panacloud_agent")
+    ok = stable_prefix(await conversation(main.graph.entry), volatile_tail=False)
+
+    print("Panacloud_agent + volatile instructions, PrefixCacheModel")
+    agent = main.graph.entry.clone(instructions=volatile_instructions, model=PrefixCacheModel(model), input_guardrails=[])
+    ok &= stable_prefix(await conversation(agent), volatile_tail=True)
+
+    print("Panacloud_agent + volatile instructions, in the system prompt (expected to break)")
+    agent = main.graph.entry.clone(instructions=naive_instructions, model=model, input_guardrails=[])
+    stable_prefix(await conversation(agent), volatile_tail=False)
+
+    print(json.dumps({k: v for k, v in stats.summary().items() if k != "last"}, indent=2))
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(run()))
@@ -0,0 +1,225 @@
+# uv run fake_openai.py --port 8900 --ttft-ms 300 --tokens-per-sec 50
+"""A local OpenAI-compatible server for running the agents without an API key.
+
+Serves /v1/chat/completions (plain and streamed) and /v1/embeddings with
+deterministic answers and configurable latency:
+
+- `--ttft-ms`: time before the first token, i.e. the provider's queue and
+  prompt processing time
+- `--tokens-per-sec`: output speed; a word counts as one token
+- `--max-concurrency`: requests served at once, like a provider's concurrency
+  limit; the rest wait their turn (0, the default, is no limit)
+
+Answers follow the request:
+
+- a JSON schema response format gets an object built from the schema; booleans
+  are false when the user text contains one of `--reject-words` and strings
+  are `--string-tokens` words. Arrays get one item per string of the JSON array
+  that ends the user text (see batching.py), built from that string alone
+- with function tools (other than handoffs) and no tool results yet, every tool
+  is called at once, so agents-as-tools run in parallel
+- with handoff tools, the handoff whose description shares the most words with
+  the user text is taken; ties and no overlap answer directly
+- anything else gets a `--reply-tokens` word answer
+
+Point a client at it with `AsyncOpenAI(base_url="http://127.0.0.1:8900/v1/")`.
+"""
+import argparse
+import asyncio
+import json
+import re
+import time
+import zlib
+from typing import Any
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+app = FastAPI(title="Fake OpenAI")
+
+settings = {
+    "ttft_ms": 300.0,
+    "tokens_per_sec": 50.0,
+    "reply_tokens": 40,
+    "reject_words": {"cooking", "recipe", "football"},
+    "max_concurrency": 0,
+    "string_tokens": 1,
+}
+_WORD = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {"the", "and", "for", "agent", "handoff", "handle", "request", "queries", "all", "its", "regarding", "handling", "specialized", "development"}
+
+
+def _text(content: Any) -> str:
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content or ""
+
+
+def _user_text(messages: list[dict[str, Any]]) -> str:
+    users = [m for m in messages if m["role"] == "user"]
+    return _text(users[-1]["content"]) if users else ""
+
+
+def _words(text: str) -> set[str]:
+    return {w for w in _WORD.findall(text.lower()) if len(w) > 2 and w not in _STOPWORDS}
+
+
+def _batch_inputs(user_text: str) -> list[str]:
+    _, _, inputs = user_text.partition("\n\n")
+    try:
+        return json.loads(inputs)
+    except ValueError:
+        return []
+
+
+def _from_schema(schema: dict[str, Any], defs: dict[str, Any], user_text: str) -> Any:
+    if "$ref" in schema:
+        return _from_schema(defs[schema["$ref"].rsplit("/", 1)[-1]], defs, user_text)
+    kind = schema.get("type")
+    if kind == "object":
+        return {name: _from_schema(sub, defs, user_text) for name, sub in schema.get("properties", {}).items()}
+    if kind == "boolean":
+        return not (_words(user_text) & settings["reject_words"])
+    if kind in ("integer", "number"):
+        return 0
+    if kind == "array":
+        return [_from_schema(schema.get("items", {}), defs, text) for text in _batch_inputs(user_text)]
+    if "anyOf" in schema:
+        return _from_schema(schema["anyOf"][0], defs, user_text)
+    return " ".join(["fake"] * settings["string_tokens"])
+
+
+def _handoff(tools: list[dict[str, Any]], user_text: str) -> str | None:
+    words = _words(user_text)
+    scores = sorted(
+        ((len(words & _words(t["function"].get("description", ""))), t["function"]["name"]) for t in tools),
+        reverse=True,
+    )
+    if not scores or scores[0][0] == 0 or (len(scores) > 1 and scores[1][0] == scores[0][0]):
+        return None
+    return scores[0][1]
+
+
+def answer(body: dict[str, Any]) -> tuple[str | None, list[dict[str, Any]]]:
+    """The reply text, or the tool calls to make."""
+    messages = body["messages"]
+    user_text = _user_text(messages)
+    response_format = body.get("response_format") or {}
+    if response_format.get("type") == "json_schema":
+        schema = response_format["json_schema"]["schema"]
+        return json.dumps(_from_schema(schema, schema.get("$defs", {}), user_text)), []
+
+    tools = body.get("tools") or []
+    called = any(m["role"] == "tool" for m in messages)
+    functions = [t for t in tools if not t["function"]["name"].startswith("transfer_to_")]
+    if functions and not called:
+        return None, [
+            {"id": f"call_{i}", "type": "function",
+             "function": {"name": t["function"]["name"], "arguments": json.dumps({"input": user_text})}}
+            for i, t in enumerate(functions)
+        ]
+    handoffs = [t for t in tools if t["function"]["name"].startswith("transfer_to_")]
+    target = _handoff(handoffs, user_text) if handoffs and not called else None
+    if target is not None:
+        return None, [{"id": "call_handoff", "type": "function", "function": {"name": target, "arguments": "{}"}}]
+
+    words = f"Here is an answer about {user_text[:60]}".split()
+    words += ["lorem"] * max(0, settings["reply_tokens"] - len(words))
+    return " ".join(words), []
+
+
+def _usage(body: dict[str, Any], completion_tokens: int) -> dict[str, int]:
+    prompt_tokens = len(json.dumps(body["messages"])) // 4
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens}
+
+
+def _chunk(delta: dict[str, Any], finish_reason: str | None = None, **extra: Any) -> str:
+    chunk = {"id": "fake", "object": "chat.completion.chunk", "created": int(time.time()), "model": "fake",
+             "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}], **extra}
+    return f"data: {json.dumps(chunk)}\n\n"
+
+
+_slots: asyncio.Semaphore | None = None
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    global _slots
+    if settings["max_concurrency"] and _slots is None:
+        _slots = asyncio.Semaphore(settings["max_concurrency"])
+    if _slots is None:
+        return await _chat_completions(request)
+    async with _slots:
+        return await _chat_completions(request)
+
+
+async def _chat_completions(request: Request):
+    body = await request.json()
+    text, calls = answer(body)
+    tokens = text.split(" ") if text is not None else []
+    per_token = 1 / settings["tokens_per_sec"]
+    await asyncio.sleep(settings["ttft_ms"] / 1000)
+
+    if body.get("stream"):
+        async def events():
+            if calls:
+                yield _chunk({"role": "assistant", "tool_calls": [dict(c, index=i) for i, c in enumerate(calls)]})
+            for i, token in enumerate(tokens):
+                yield _chunk({"role": "assistant", "content": token if i == 0 else " " + token})
+                await asyncio.sleep(per_token)
+            yield _chunk({}, "tool_calls" if calls else "stop", usage=_usage(body, len(tokens) or 5))
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    await asyncio.sleep(per_token * len(tokens))
+    message: dict[str, Any] = {"role": "assistant", "content": text}
+    if calls:
+        message["tool_calls"] = calls
+    return JSONResponse({
+        "id": "fake", "object": "chat.completion", "created": int(time.time()), "model": body["model"],
+        "choices": [{"index": 0, "message": message, "finish_reason": "tool_calls" if calls else "stop"}],
+        "usage": _usage(body, len(tokens) or 5),
+    })
+
+
+@app.post("/v1/embeddings")
+async def embeddings(request: Request):
+    body = await request.json()
+    inputs = [body["input"]] if isinstance(body["input"], str) else body["input"]
+    data = []
+    for index, text in enumerate(inputs):
+        # Bag of hashed words, so similar texts get similar vectors
+        vector = [0.0] * 64
+        for word in _WORD.findall(text.lower()):
+            vector[zlib.crc32(word.encode()) % 64] += 1.0
+        data.append({"object": "embedding", "index": index, "embedding": vector})
+    return {"object": "list", "data": data, "model": body["model"], "usage": {"prompt_tokens": 0, "total_tokens": 0}}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--ttft-ms", type=float, default=settings["ttft_ms"])
+    parser.add_argument("--tokens-per-sec", type=float, default=settings["tokens_per_sec"])
+    parser.add_argument("--reply-tokens", type=int, default=settings["reply_tokens"])
+    parser.add_argument("--reject-words", default=",".join(sorted(settings["reject_words"])))
+    parser.add_argument("--max-concurrency", type=int, default=settings["max_concurrency"])
+    parser.add_argument("--string-tokens", type=int, default=settings["string_tokens"])
+    args = parser.parse_args()
+    settings.update(
+        ttft_ms=args.ttft_ms,
+        tokens_per_sec=args.tokens_per_sec,
+        reply_tokens=args.reply_tokens,
+        reject_words=set(args.reject_words.split(",")),
+        max_concurrency=args.max_concurrency,
+        string_tokens=args.string_tokens,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
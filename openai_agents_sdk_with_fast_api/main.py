@@ -1,18 +1,21 @@
-from agents import Agent, Runner, set_tracing_disabled, OpenAIChatCompletionsModel, ModelProvider, RunConfig
+from agents import Agent, Runner, set_tracing_disabled, OpenAIChatCompletionsModel, ModelProvider, RunConfig, ModelSettings
 from agents.extensions.models.litellm_model import LitellmModel
 from openai import AsyncOpenAI
 from dotenv import load_dotenv, find_dotenv
 from fastapi import FastAPI, HTTPException, Path, Query
-import json
+import logging
 import os
 from uuid import uuid4
 from typing import cast
 from pydantic import BaseModel, Field
 from datetime import datetime, UTC
-from fastapi.responses import StreamingResponse
+from time import perf_counter
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from openai.types.responses import ResponseTextDeltaEvent
 from agents import (
     GuardrailFunctionOutput,
+    ItemHelpers,
     InputGuardrailTripwireTriggered,
     OutputGuardrailTripwireTriggered,
     RunContextWrapper,
@@ -20,12 +23,37 @@ from agents import (
     input_guardrail,
     output_guardrail,
 )
+from speculative import check_guardrails, run_speculative, stream_speculative, timings
+from prefilter import KeywordPrefilter, LinearPrefilter, PrefilterChain, input_text
+from agent_runtime.router import HandoffRouter
+from sessions import session_store_from_env
+from cache import CacheLookup, ResponseCache, graph_version
+from agent_tools import streaming_agent_tool, with_sub_agent_events
+from agent_runtime.graph import compile_graph
+from agent_runtime.prompt_cache import PrefixCacheModel, stats as prompt_cache_stats
+from sse import SSEError, sse_stream
+from admission import Conversations, Rejected, admission_from_env
+from replay import Cassette, ReplayModel
+from batching import BatchingModel
+from structured_output import StructuredOutput, run_until
+from metrics import MetricsRunner, metrics
+from agent_runtime.log_sink import enable_structured_logging
+from agents.run import set_default_agent_runner
+from contextlib import aclosing, asynccontextmanager
 
 load_dotenv(find_dotenv())
+# JSON lines from a background thread, INFO and up unless LOG_LEVEL is set.
+# LOG_LEVEL=DEBUG adds a line per verdict and answer; LOG_SAMPLE=chat=0.01 keeps 1% of them
+enable_structured_logging(("chat",))
+logger = logging.getLogger("chat")
 BASE_URL = "https://generativelanguage.googleapis.com/v1beta/openai/"
 MODEL = "gemini-1.5-flash"
 set_tracing_disabled(disabled=True)
 
+# Per-phase timings of every run instead of hosted tracing, served at /metrics; METRICS=0 turns it off
+if os.getenv("METRICS", "1") != "0":
+    set_default_agent_runner(MetricsRunner())
+
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
 
@@ -36,10 +64,38 @@ client = AsyncOpenAI(
     base_url=BASE_URL
 )
 
+# PROMPT_CACHE_HINTS=openai|anthropic adds provider cache hints; Gemini caches implicitly
+PROMPT_CACHE_HINTS = os.getenv("PROMPT_CACHE_HINTS") or None
+
+# MODEL_CASSETTE=path records model responses to a file or answers from it (see replay.py)
+MODEL_CASSETTE = Cassette(os.environ["MODEL_CASSETTE"]) if os.getenv("MODEL_CASSETTE") else None
+
+def chat_model() -> PrefixCacheModel:
+    # Keeps each request's prefix stable and records cached tokens from usage
+    model = OpenAIChatCompletionsModel(model=MODEL, openai_client=client)
+    if MODEL_CASSETTE is not None:
+        model = ReplayModel(
+            model,
+            MODEL_CASSETTE,
+            mode=os.getenv("MODEL_CASSETTE_MODE", "replay"),
+            speed=float(os.getenv("MODEL_REPLAY_SPEED", "0")),
+        )
+    return PrefixCacheModel(model, hints=PROMPT_CACHE_HINTS)
+
+# Conversation history keyed by Metadata.session_id
+sessions = session_store_from_env()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Write out anything still in the write-behind buffer
+    await sessions.close()
+
 app = FastAPI(
     title="Suhaib Chatbot API",
     description="A FastAPI-based API for a chatbot",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 class Metadata(BaseModel):
@@ -53,6 +109,36 @@ class Message(BaseModel):
     tags: list[str] | None = None
 
 
+# Per-user rate limits and a cap on requests running agents at the same time
+admission = admission_from_env()
+# Conversations the server has answered before; they get priority in the queue
+conversations = Conversations()
+metrics.describe("chat_queue_wait_seconds", "Time a /chat request waited for an admission slot")
+metrics.describe("chat_rejected_total", "Requests turned away by admission control, by reason")
+metrics.describe("chat_in_flight", "Requests running agents right now")
+metrics.describe("chat_queued", "Requests waiting for an admission slot")
+
+async def admit(message: Message):
+    # Conversations already under way go ahead of new ones. Only a session this
+    # server has answered for this user counts, so clients can't claim priority
+    session_id = message.metadata.session_id if message.metadata else None
+    priority = 0 if (message.user_id, session_id) in conversations else 1
+    start = perf_counter()
+    try:
+        ticket = await admission.acquire(message.user_id, priority=priority)
+        metrics.observe("chat_queue_wait_seconds", perf_counter() - start)
+        return ticket
+    except Rejected as e:
+        metrics.inc("chat_rejected_total", reason=e.reason)
+        status_code = 429 if e.reason == "rate_limited" else 503
+        raise HTTPException(status_code=status_code, detail=str(e), headers=e.headers)
+
+
+async def save_turn(message: Message, metadata: Metadata, items: list[TResponseInputItem]) -> None:
+    await sessions.append(metadata.session_id, items)
+    conversations.add(message.user_id, metadata.session_id)
+
+
 class Response(BaseModel):
     user_id: str
     reply: str
@@ -66,32 +152,61 @@ guardrail_agent = Agent(
     name="Guardrail check",
     instructions="Check if the user is asking a question related to app development,mobile development, or Agentic AI, cloud or OpenAI agents sdk\
         Mark all other inputs as irrelevant",
-    model=OpenAIChatCompletionsModel(model=MODEL, openai_client=client),
-    output_type=Input,
+    # Opt-in: GUARDRAIL_BATCH_MAX>1 sends concurrent checks as one request, which
+    # mixes different users' inputs in one prompt (see BatchingModel)
+    model=BatchingModel(
+        chat_model(),
+        max_batch=int(os.getenv("GUARDRAIL_BATCH_MAX", "1")),
+        max_wait=float(os.getenv("GUARDRAIL_BATCH_WAIT_MS", "5")) / 1000,
+    ),
+    # Schema and validator built once instead of on every check
+    output_type=StructuredOutput(Input),
+
+)
 
+# GUARDRAIL_STREAM=1 streams the check and decides as soon as is_relevant_input
+# is out, before the reasoning; streamed checks are not batched
+GUARDRAIL_STREAM = os.getenv("GUARDRAIL_STREAM", "0") == "1"
+
+# Local stages that answer for the guardrail LLM when they are confident: the
+# calibrated keyword stage accepts, the online model only rejects unless
+# PREFILTER_ACCEPT=1 (see PrefilterChain)
+prefilter = PrefilterChain(
+    [KeywordPrefilter(), LinearPrefilter()], accept=os.getenv("PREFILTER_ACCEPT", "0") == "1"
 )
 
 @input_guardrail
 async def guard(
     ctx: RunContextWrapper[None], agent: Agent, input: str | list[TResponseInputItem]
 ) -> GuardrailFunctionOutput:
-    result = await Runner.run(guardrail_agent, input, context=ctx.context)
-    print(result.final_output)
+    text = input_text(input)
+    verdict = prefilter.classify(text)
+    if verdict is None:
+        if GUARDRAIL_STREAM:
+            relevant, partial = await run_until(guardrail_agent, input, "is_relevant_input", context=ctx.context)
+            verdict = Input(is_relevant_input=relevant, reasoning=partial.get("reasoning", ""))
+        else:
+            result = await Runner.run(guardrail_agent, input, context=ctx.context)
+            verdict = result.final_output
+        prefilter.observe(text, verdict.is_relevant_input)
+    logger.getChild("guardrail").debug(
+        "verdict", extra={"relevant": verdict.is_relevant_input, "reasoning": verdict.reasoning}
+    )
     return GuardrailFunctionOutput(
-        output_info=result.final_output,
-        tripwire_triggered=result.final_output.is_relevant_input is False,
+        output_info=verdict,
+        tripwire_triggered=verdict.is_relevant_input is False,
     )
 Cloud_Agent = Agent(
     name="Cloud Computing Agent",
     instructions="Specialized Agent to answer queries regarding Cloud computing in the contect of Agentic AI",
-    model=OpenAIChatCompletionsModel(model=MODEL, openai_client=client)
+    model=chat_model()
     # model=LitellmModel(model="gemini/gemini-2.0-flash",api_key=GEMINI_API_KEY) 
 )
 
 OpenAI_agents_sdk_agent = Agent(
     name="Openai agents sdk agent",
     instructions="Specialized Agent to answer queries regarding the Openai agents sdk agentic framework",
-    model=OpenAIChatCompletionsModel(model=MODEL, openai_client=client)
+    model=chat_model()
     # model=LitellmModel(model="gemini/gemini-2.0-flash",api_key=GEMINI_API_KEY)
 
 )
@@ -100,7 +215,7 @@ MobileDev_agent = Agent(
     instructions="You are the MobileDev agent, an expert in mobile development. \
                 Handle queries about iOS (Swift), Android (Kotlin/Java), and cross-platform tools like Flutter. Provide detailed guidance, code snippets, and mobile-specific solutions.\
                 Respond only to mobile development-specific queries handed off by the Panaversity agent.",
-     model=OpenAIChatCompletionsModel(model=MODEL, openai_client=client),
+     model=chat_model(),
     # model=LitellmModel(model="gemini/gemini-2.0-flash",api_key=GEMINI_API_KEY),
     handoff_description="handles all queries regarding MObile Development and it's development"
 )
@@ -110,7 +225,7 @@ WebDev_agent = Agent(
     instructions="You are the WebDev agent, an expert in web development. \
                  Handle queries about HTML, CSS, JavaScript, and web frameworks. Provide detailed code examples, best practices, and troubleshooting advice.\
                  Respond only to web development-specific queries handed off by the Panaversity agent.",
-    model=OpenAIChatCompletionsModel(model=MODEL, openai_client=client),
+    model=chat_model(),
     # model=LitellmModel(model="gemini/gemini-2.0-flash",api_key=GEMINI_API_KEY),
     handoff_description="specialized in handling all queries regarding Web development and it's development"
 )
@@ -121,19 +236,23 @@ AgenticAI_Agent = Agent(
                  Handle queries about AI agent design, implementation, and optimization.\
                  Use the CloudAgent and OpenAIAgent as tools to assist with cloud-based processing and advanced AI model interactions. \
                  Respond only to agentic AI-specific queries handed off by the Panaversity agent.",
-    model=OpenAIChatCompletionsModel(model=MODEL, openai_client=client),             
+    model=chat_model(),             
     # model=LitellmModel(model="gemini/gemini-2.0-flash",api_key=GEMINI_API_KEY),
     handoff_description="specialized in handling all queries regaring Agentic AI and it's development",
     tools=[
-        Cloud_Agent.as_tool(
+        streaming_agent_tool(
+            Cloud_Agent,
             tool_name="Cloud_Agent",
             tool_description="A tool for retrieving cloud-based information in the field of Agentic AI",
         ),
-        OpenAI_agents_sdk_agent.as_tool(
+        streaming_agent_tool(
+            OpenAI_agents_sdk_agent,
             tool_name="OpenAI_agents_sdk_Agent",
             tool_description="A tool for retrieving information OpenAI agent sdk agentic framework in the field of Agentic AI"
         )
-    ]
+    ],
+    # Lets the model ask both sub-agents in one turn so they run at the same time
+    model_settings=ModelSettings(parallel_tool_calls=True),
 )
 
 
@@ -146,44 +265,147 @@ Panacloud_agent = Agent(
                   if it contains 'agentic', 'AI agent', or 'cloud' in the context of AI, transfer to AgenticAI_agent. \
                   For all other queries, provide clear, concise, and educational responses with a teaching tone.",
       handoffs=[WebDev_agent, AgenticAI_Agent, MobileDev_agent],
-      model=OpenAIChatCompletionsModel(model=MODEL, openai_client=client),
+      model=chat_model(),
       input_guardrails=[guard]
     #   model=LitellmModel(model="gemini/gemini-2.0-flash",api_key=GEMINI_API_KEY)
   )
 
+# Same rules as Panacloud_agent's instructions, so clear-cut queries skip the triage turn.
+# "cloud" alone is left to triage: it only means AgenticAI in the context of AI
+router = HandoffRouter(Panacloud_agent, keywords={
+    WebDev_agent.name: ["web", "html", "css", "javascript"],
+    MobileDev_agent.name: ["mobile", "ios", "android", "flutter"],
+    AgenticAI_Agent.name: ["agentic", "ai agent", "ai agents"],
+})
+
+# Frozen copy of the graph: handoffs are built once here instead of on every turn
+graph = compile_graph(Panacloud_agent, [WebDev_agent, AgenticAI_Agent, MobileDev_agent])
+
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-004")
+
+async def embed(text: str) -> list[float]:
+    response = await client.embeddings.create(model=EMBEDDING_MODEL, input=text)
+    return response.data[0].embedding
+
+# Opt-in cache for first-turn questions, enabled with RESPONSE_CACHE=1
+response_cache = ResponseCache(
+    graph_version(Panacloud_agent),
+    embed=embed,
+    threshold=float(os.getenv("RESPONSE_CACHE_THRESHOLD", "0.92")),
+    ttl=float(os.getenv("RESPONSE_CACHE_TTL", "3600")),
+) if os.getenv("RESPONSE_CACHE") == "1" else None
+
+async def check_cached(lookup: CacheLookup, input: list[TResponseInputItem]) -> None:
+    """Runs the input guardrails on a semantic hit before its reply is served.
+
+    An exact hit is the text that already passed them when it was stored; a
+    semantic one is a different question that only looks similar.
+    """
+    if lookup.tier != "semantic":
+        return
+    try:
+        await check_guardrails(graph.entry, input, RunContextWrapper(context=None))
+    except InputGuardrailTripwireTriggered:
+        response_cache.rejected += 1
+        raise
+
 @app.post("/chat/", response_model=Response)
 async def chat(message: Message):
     if not message.text.strip():
         raise HTTPException(
             status_code=400, detail="Message text cannot be empty")
 
+    async with await admit(message):
+        return await answer(message)
+
+async def answer(message: Message) -> Response:
+    # Continue the conversation stored under this session, or start a new one
+    metadata = message.metadata or Metadata()
+    history = await sessions.load(metadata.session_id)
+    user_item: TResponseInputItem = {"role": "user", "content": message.text}
+
+    # Only questions without earlier context are answered from the cache
+    lookup = None
+    if response_cache is not None and not history:
+        lookup = await response_cache.lookup(message.text)
+        if lookup.entry is not None:
+            try:
+                await check_cached(lookup, [user_item])
+            except InputGuardrailTripwireTriggered:
+                raise HTTPException(
+                    status_code=400, detail="Sorry I cannot answer that question")
+            await save_turn(message, metadata, [user_item, {"role": "assistant", "content": lookup.entry.reply}])
+            return Response(user_id=message.user_id, reply=lookup.entry.reply, metadata=metadata)
+
     # Use the OpenAI Agents SDK to process the message
     try:
-        result = await Runner.run(starting_agent=Panacloud_agent, input=message.text)
+        # The guardrail runs alongside the agent instead of before it
+        agent = router.route(message.text) or graph.entry
+        result = await run_speculative(agent, history + [user_item])
         reply_text = result.final_output  # Get the agent's response
-        print(result.last_agent.name)
+        logger.debug("answered", extra={"agent": result.last_agent.name, "session": metadata.session_id})
 
     except InputGuardrailTripwireTriggered:
         raise HTTPException(
             status_code=400, detail="Sorry I cannot answer that question")
+    await save_turn(message, metadata, result.to_input_list()[len(history):])
+    if lookup is not None:
+        response_cache.store(lookup, str(reply_text), result.last_agent.name)
     return Response(
         user_id=message.user_id,
         reply=reply_text,
-        metadata=Metadata()
+        metadata=metadata
     )
 
-async def stream_response(message: Message):
+async def stream_response(message: Message, metadata: Metadata, ticket):
+    # Yields chunk payloads; sse_stream batches and encodes them
+    try:
+        async with aclosing(stream_turn(message, metadata)) as payloads:
+            async for payload in payloads:
+                yield payload
+    finally:
+        ticket.release()
+
+async def stream_turn(message: Message, metadata: Metadata):
+    history = await sessions.load(metadata.session_id)
+    new_items: list[TResponseInputItem] = [{"role": "user", "content": message.text}]
+
+    lookup = None
+    if response_cache is not None and not history:
+        lookup = await response_cache.lookup(message.text)
+        if lookup.entry is not None:
+            try:
+                await check_cached(lookup, new_items)
+            except InputGuardrailTripwireTriggered:
+                yield SSEError(status=400, detail="Sorry I cannot answer that question")
+                return
+            yield {"chunk": lookup.entry.reply}
+            await save_turn(message, metadata, new_items + [{"role": "assistant", "content": lookup.entry.reply}])
+            return
+
+    reply_text = None
+    last_agent = None
     try:
-        result = Runner.run_streamed(starting_agent=Panacloud_agent, input=message.text)
-        async for event in result.stream_events():
-            if event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
-                print(event.data.delta, end="", flush=True)
-                # Serialize dictionary to JSON string
-                chunk = json.dumps({"chunk": event.data.delta})
-                yield f"data: {chunk}\n\n"
+        agent = router.route(message.text) or graph.entry
+        async for event in with_sub_agent_events(lambda: stream_speculative(agent, history + new_items)):
+            if event.type == "sub_agent_event":
+                # Output of an agent running as a tool, tagged with where it comes from
+                yield {"chunk": event.delta, "tool": event.tool_name, "call": event.call, "agent": event.agent_name}
+            elif event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
+                yield {"chunk": event.data.delta}
+            elif event.type == "run_item_stream_event":
+                new_items.append(event.item.to_input_item())
+                if event.item.type == "message_output_item":
+                    reply_text = ItemHelpers.text_message_output(event.item)
+            elif event.type == "agent_updated_stream_event":
+                last_agent = event.new_agent
+        # Only a completed turn is added to the session
+        await save_turn(message, metadata, new_items)
+        if lookup is not None and reply_text is not None:
+            response_cache.store(lookup, reply_text, last_agent.name)
     except InputGuardrailTripwireTriggered:
-        raise HTTPException(
-            status_code=400, detail="Sorry I cannot answer that question")
+        # The response has already started, so this goes out as an SSE error event
+        yield SSEError(status=400, detail="Sorry I cannot answer that question")
 
             
 @app.post("/chat/stream", response_model=Response)
@@ -192,8 +414,49 @@ async def chat_stream(message: Message):
         raise HTTPException(
             status_code=400, detail="Message text cannot be empty")
 
+    ticket = await admit(message)
+    metadata = message.metadata or Metadata()
     return StreamingResponse(
-        stream_response(message),
-        media_type="text/event-stream"
+        sse_stream(stream_response(message, metadata, ticket)),
+        media_type="text/event-stream",
+        headers={"X-Session-Id": metadata.session_id},
+        # Also frees the slot when the client leaves before the stream starts
+        background=BackgroundTask(ticket.release),
     )
 
+
+@app.get("/chat/timings")
+async def chat_timings():
+    return timings.summary()
+
+
+@app.get("/guardrail/prefilter")
+async def guardrail_prefilter():
+    return prefilter.stats()
+
+
+@app.get("/guardrail/batching")
+async def guardrail_batching():
+    return guardrail_agent.model.stats.summary()
+
+
+@app.get("/chat/prompt-cache")
+async def chat_prompt_cache():
+    return prompt_cache_stats.summary()
+
+
+@app.get("/chat/cache")
+async def chat_cache():
+    return response_cache.stats() if response_cache is not None else {"enabled": False}
+
+
+@app.get("/admission")
+async def admission_stats():
+    return admission.stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    metrics.set("chat_in_flight", admission.in_flight)
+    metrics.set("chat_queued", admission.queued)
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
\ No newline at end of file
@@ -0,0 +1,317 @@
+from bisect import bisect_left
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from time import perf_counter
+from typing import Any
+
+from agents import Agent, AgentOutputSchemaBase, Model, ModelResponse, RunConfig, RunContextWrapper, RunHooks, Tool
+from agents.run import AgentRunner
+from openai.types.responses import ResponseCompletedEvent
+
+# Seconds; covers everything from a parsed tool argument to a slow model call
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class Histogram:
+    """Fixed buckets and plain int counters.
+
+    Observations happen on the event loop thread, so there is nothing to lock:
+    an observation is a bisect and two additions.
+    """
+
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: tuple[float, ...] = BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Labels, extra: str = "") -> str:
+    parts = [f'{key}="{_escape(value)}"' for key, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Metrics:
+    """In-process histograms, counters and gauges, rendered in the Prometheus text format.
+
+    Label values are passed as keyword arguments; pass them in the same order on
+    every call for a metric, they are used as given for the series key.
+    """
+
+    def __init__(self) -> None:
+        self.help: dict[str, str] = {}
+        self.histograms: dict[str, dict[Labels, Histogram]] = {}
+        self.counters: dict[str, dict[Labels, float]] = {}
+        self.gauges: dict[str, dict[Labels, float]] = {}
+
+    def describe(self, name: str, help: str) -> None:
+        self.help[name] = help
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        series = self.histograms.setdefault(name, {})
+        key = tuple(labels.items())
+        histogram = series.get(key)
+        if histogram is None:
+            histogram = series[key] = Histogram()
+        histogram.observe(value)
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        series = self.counters.setdefault(name, {})
+        key = tuple(labels.items())
+        series[key] = series.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels: str) -> None:
+        self.gauges.setdefault(name, {})[tuple(labels.items())] = value
+
+    def render(self) -> str:
+        lines: list[str] = []
+
+        def header(name: str, kind: str) -> None:
+            if name in self.help:
+                lines.append(f"# HELP {name} {self.help[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        for name, series in self.histograms.items():
+            header(name, "histogram")
+            for labels, histogram in list(series.items()):
+                total = 0
+                for bound, count in zip(histogram.bounds, histogram.counts):
+                    total += count
+                    le = f'le="{bound}"'
+                    lines.append(f"{name}_bucket{_labels(labels, le)} {total}")
+                total += histogram.counts[-1]
+                le = 'le="+Inf"'
+                lines.append(f"{name}_bucket{_labels(labels, le)} {total}")
+                lines.append(f"{name}_sum{_labels(labels)} {histogram.sum}")
+                lines.append(f"{name}_count{_labels(labels)} {total}")
+        for kind, metrics in (("counter", self.counters), ("gauge", self.gauges)):
+            for name, values in metrics.items():
+                header(name, kind)
+                for labels, value in list(values.items()):
+                    lines.append(f"{name}{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+metrics.describe("agent_phase_seconds", "Time per phase of an agent run: guardrail, model, tool, handoff, output_parsing")
+metrics.describe("agent_run_seconds", "Duration of a whole non-streamed agent run")
+metrics.describe("agent_runs_total", "Agent runs started")
+metrics.describe("agent_run_errors_total", "Agent runs that raised, by exception type")
+metrics.describe("agent_tokens_total", "Tokens sent to and received from models")
+metrics.describe("agent_handoffs_total", "Handoffs between agents")
+
+
+class TimedModel(Model):
+    """Records the duration and token usage of every call to `inner`."""
+
+    def __init__(self, inner: Model, agent: str):
+        self.inner = inner
+        self.agent = agent
+        self.model = str(getattr(inner, "model", type(inner).__name__))
+
+    def _usage(self, input_tokens: int, output_tokens: int) -> None:
+        metrics.inc("agent_tokens_total", input_tokens, model=self.model, direction="input")
+        metrics.inc("agent_tokens_total", output_tokens, model=self.model, direction="output")
+
+    async def get_response(self, *args: Any, **kwargs: Any) -> ModelResponse:
+        start = perf_counter()
+        try:
+            response = await self.inner.get_response(*args, **kwargs)
+        finally:
+            metrics.observe("agent_phase_seconds", perf_counter() - start, phase="model", agent=self.agent)
+        self._usage(response.usage.input_tokens, response.usage.output_tokens)
+        return response
+
+    async def stream_response(self, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        start = perf_counter()
+        try:
+            async for event in self.inner.stream_response(*args, **kwargs):
+                if isinstance(event, ResponseCompletedEvent) and event.response.usage:
+                    self._usage(event.response.usage.input_tokens, event.response.usage.output_tokens)
+                yield event
+        finally:
+            metrics.observe("agent_phase_seconds", perf_counter() - start, phase="model", agent=self.agent)
+
+
+class TimedOutputSchema(AgentOutputSchemaBase):
+    """Times the parsing and validation of an agent's final output."""
+
+    def __init__(self, inner: AgentOutputSchemaBase, agent: str):
+        self.inner = inner
+        self.agent = agent
+
+    def is_plain_text(self) -> bool:
+        return self.inner.is_plain_text()
+
+    def name(self) -> str:
+        return self.inner.name()
+
+    def json_schema(self) -> dict[str, Any]:
+        return self.inner.json_schema()
+
+    def is_strict_json_schema(self) -> bool:
+        return self.inner.is_strict_json_schema()
+
+    def validate_json(self, json_str: str) -> Any:
+        start = perf_counter()
+        try:
+            return self.inner.validate_json(json_str)
+        finally:
+            metrics.observe("agent_phase_seconds", perf_counter() - start, phase="output_parsing", agent=self.agent)
+
+
+class MetricsHooks(RunHooks[Any]):
+    """Times tool calls and handoffs, then passes every hook on to `inner`.
+
+    A handoff is timed from the handoff call until the next agent starts, which
+    covers input filters and switching agents.
+    """
+
+    def __init__(self, inner: RunHooks[Any] | None):
+        self.inner = inner
+        self._tools: dict[int, float] = {}
+        self._handoff: float | None = None
+
+    async def on_agent_start(self, context: RunContextWrapper[Any], agent: Agent[Any]) -> None:
+        if self._handoff is not None:
+            metrics.observe("agent_phase_seconds", perf_counter() - self._handoff, phase="handoff", agent=agent.name)
+            self._handoff = None
+        if self.inner is not None:
+            await self.inner.on_agent_start(context, agent)
+
+    async def on_agent_end(self, context: RunContextWrapper[Any], agent: Agent[Any], output: Any) -> None:
+        if self.inner is not None:
+            await self.inner.on_agent_end(context, agent, output)
+
+    async def on_handoff(self, context: RunContextWrapper[Any], from_agent: Agent[Any], to_agent: Agent[Any]) -> None:
+        self._handoff = perf_counter()
+        metrics.inc("agent_handoffs_total", source=from_agent.name, target=to_agent.name)
+        if self.inner is not None:
+            await self.inner.on_handoff(context, from_agent, to_agent)
+
+    async def on_tool_start(self, context: RunContextWrapper[Any], agent: Agent[Any], tool: Tool) -> None:
+        # Each function call gets its own ToolContext, so parallel calls don't mix
+        self._tools[id(context)] = perf_counter()
+        if self.inner is not None:
+            await self.inner.on_tool_start(context, agent, tool)
+
+    async def on_tool_end(self, context: RunContextWrapper[Any], agent: Agent[Any], tool: Tool, result: str) -> None:
+        start = self._tools.pop(id(context), None)
+        if start is not None:
+            metrics.observe("agent_phase_seconds", perf_counter() - start, phase="tool", agent=agent.name)
+        if self.inner is not None:
+            await self.inner.on_tool_end(context, agent, tool, result)
+
+
+class MetricsRunner(AgentRunner):
+    """An `AgentRunner` that records where the time of every run goes.
+
+    Install it once with `set_default_agent_runner(MetricsRunner())`; `Runner.run`
+    and `Runner.run_streamed` then go through it. Each phase is a label of the
+    `agent_phase_seconds` histogram:
+
+    - `guardrail`: input guardrails (together) and output guardrails
+    - `model`: each model call, and its input/output tokens
+    - `tool`: each function tool call
+    - `handoff`: from a handoff call until the next agent starts
+    - `output_parsing`: validating a structured final output
+
+    The overhead is a few `perf_counter` calls and dict updates per phase.
+    """
+
+    # Wrappers are made once per agent and model, not on every turn. Bounded,
+    # since a provider may hand out a new model object for every run
+    max_wrappers = 256
+    _models: OrderedDict[tuple[str, int], tuple[Model, TimedModel]] = OrderedDict()
+    _schemas: OrderedDict[tuple[str, int], tuple[Any, TimedOutputSchema]] = OrderedDict()
+
+    @classmethod
+    def _wrapper(cls, cache: OrderedDict[tuple[str, int], tuple[Any, Any]], name: str, wrapped: Any, make: Any) -> Any:
+        # Keyed by id(), so the entry also holds `wrapped` to be sure the id is still its own
+        key = (name, id(wrapped))
+        cached = cache.get(key)
+        if cached is None or cached[0] is not wrapped:
+            cached = cache[key] = (wrapped, make())
+            if len(cache) > cls.max_wrappers:
+                cache.popitem(last=False)
+        cache.move_to_end(key)
+        return cached[1]
+
+    async def run(self, starting_agent: Agent[Any], input: Any, **kwargs: Any) -> Any:
+        kwargs["hooks"] = MetricsHooks(kwargs.get("hooks"))
+        metrics.inc("agent_runs_total", agent=starting_agent.name, mode="run")
+        start = perf_counter()
+        try:
+            return await super().run(starting_agent, input, **kwargs)
+        except Exception as e:
+            metrics.inc("agent_run_errors_total", agent=starting_agent.name, error=type(e).__name__)
+            raise
+        finally:
+            metrics.observe("agent_run_seconds", perf_counter() - start, agent=starting_agent.name)
+
+    def run_streamed(self, starting_agent: Agent[Any], input: Any, **kwargs: Any) -> Any:
+        kwargs["hooks"] = MetricsHooks(kwargs.get("hooks"))
+        metrics.inc("agent_runs_total", agent=starting_agent.name, mode="stream")
+        return super().run_streamed(starting_agent, input, **kwargs)
+
+    # _get_model and _get_output_schema are private to AgentRunner, which is why
+    # pyproject.toml keeps openai-agents below 0.3
+    @classmethod
+    def _get_model(cls, agent: Agent[Any], run_config: RunConfig) -> Model:
+        model = super()._get_model(agent, run_config)
+        return cls._wrapper(cls._models, agent.name, model, lambda: TimedModel(model, agent.name))
+
+    @classmethod
+    def _get_output_schema(cls, agent: Agent[Any]) -> AgentOutputSchemaBase | None:
+        schema = super()._get_output_schema(agent)
+        if schema is None:
+            return None
+        # A plain output_type gets a new schema object on every call; key on the type
+        return cls._wrapper(
+            cls._schemas, agent.name, agent.output_type, lambda: TimedOutputSchema(schema, agent.name)
+        )
+
+    @classmethod
+    async def _run_input_guardrails(cls, agent: Agent[Any], guardrails: list[Any], *args: Any, **kwargs: Any) -> Any:
+        if not guardrails:
+            return []
+        start = perf_counter()
+        try:
+            return await super()._run_input_guardrails(agent, guardrails, *args, **kwargs)
+        finally:
+            metrics.observe("agent_phase_seconds", perf_counter() - start, phase="guardrail", agent=agent.name)
+
+    @classmethod
+    async def _run_input_guardrails_with_queue(
+        cls, agent: Agent[Any], guardrails: list[Any], *args: Any, **kwargs: Any
+    ) -> Any:
+        if not guardrails:
+            return await super()._run_input_guardrails_with_queue(agent, guardrails, *args, **kwargs)
+        start = perf_counter()
+        try:
+            return await super()._run_input_guardrails_with_queue(agent, guardrails, *args, **kwargs)
+        finally:
+            metrics.observe("agent_phase_seconds", perf_counter() - start, phase="guardrail", agent=agent.name)
+
+    @classmethod
+    async def _run_output_guardrails(cls, guardrails: list[Any], agent: Agent[Any], *args: Any, **kwargs: Any) -> Any:
+        if not guardrails:
+            return []
+        start = perf_counter()
+        try:
+            return await super()._run_output_guardrails(guardrails, agent, *args, **kwargs)
+        finally:
+            metrics.observe("agent_phase_seconds", perf_counter() - start, phase="guardrail", agent=agent.name)
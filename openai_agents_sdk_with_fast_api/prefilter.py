@@ -0,0 +1,208 @@
+import math
+import re
+import zlib
+from dataclasses import dataclass, field
+from typing import Protocol
+
+from agents import ItemHelpers, TResponseInputItem
+from pydantic import BaseModel
+
+
+class Verdict(BaseModel):
+    """Same shape as the guardrail agent's `Input` output."""
+
+    is_relevant_input: bool
+    reasoning: str
+
+
+class Prefilter(Protocol):
+    """A local stage in front of the guardrail LLM.
+
+    `classify` returns a verdict when it is confident and None when the LLM should
+    decide. `observe` receives the LLM's verdicts so learning stages can improve.
+    `accepts` says whether its "relevant" verdicts may skip the LLM (see
+    PrefilterChain).
+    """
+
+    accepts: bool
+
+    def classify(self, text: str) -> Verdict | None: ...
+
+    def observe(self, text: str, is_relevant: bool) -> None: ...
+
+
+_WORD = re.compile(r"[a-z0-9+#.]+")
+
+
+def tokenize(text: str) -> list[str]:
+    return [w.strip(".") for w in _WORD.findall(text.lower()) if w.strip(".")]
+
+
+def input_text(input: str | list[TResponseInputItem]) -> str:
+    """The text of the latest user message, which is what the guardrail judges."""
+    if isinstance(input, str):
+        return input
+    for item in reversed(ItemHelpers.input_to_new_input_list(input)):
+        if item.get("role") == "user":
+            content = item.get("content")
+            if isinstance(content, str):
+                return content
+            return " ".join(
+                part.get("text", "") for part in content or [] if isinstance(part, dict)
+            )
+    return ""
+
+
+TOPIC_KEYWORDS: dict[str, dict[str, float]] = {
+    "app development": {
+        "app": 0.5, "apps": 0.5, "api": 0.6, "backend": 0.8, "frontend": 0.8,
+        "fastapi": 1.0, "django": 1.0, "react": 0.8, "html": 1.0, "css": 1.0,
+        "javascript": 1.0, "typescript": 1.0, "web": 0.6, "website": 0.8,
+        "nextjs": 1.0, "deploy": 0.6, "database": 0.6, "python": 0.6,
+    },
+    "mobile development": {
+        "mobile": 0.8, "ios": 1.0, "android": 1.0, "flutter": 1.0, "kotlin": 1.0,
+        "swiftui": 1.0, "xcode": 1.0, "dart": 0.8,
+    },
+    "agentic ai": {
+        "agent": 0.8, "agents": 0.8, "agentic": 1.0, "llm": 1.0, "handoff": 1.0,
+        "handoffs": 1.0, "guardrail": 1.0, "guardrails": 1.0, "prompt": 0.6,
+        "openai": 1.0, "gemini": 0.8, "sdk": 0.6, "rag": 0.8, "mcp": 1.0,
+    },
+    "cloud": {
+        "cloud": 0.8, "kubernetes": 1.0, "docker": 1.0, "aws": 1.0, "azure": 1.0,
+        "gcp": 1.0, "serverless": 1.0, "container": 0.8, "containers": 0.8,
+        "dapr": 1.0, "microservices": 1.0,
+    },
+}
+
+
+@dataclass
+class KeywordPrefilter:
+    """Accepts inputs that mention at least `min_matches` distinct topic keywords
+    with a total weight of at least `threshold`.
+
+    One keyword is not enough: "Which android phone should I buy for my mom?"
+    mentions a topic without being about it, and neither are two weak ones ("Tell
+    me a joke about openai agents"). The defaults are calibrated on
+    prefilter_corpus.jsonl: 8 of the 40 relevant inputs are accepted and none of
+    the 30 off-topic ones. It never rejects on its own: the absence of a keyword
+    is not confident enough.
+    """
+
+    topics: dict[str, dict[str, float]] = field(default_factory=lambda: TOPIC_KEYWORDS)
+    threshold: float = 2.0
+    min_matches: int = 2
+    accepts: bool = True
+
+    def __post_init__(self) -> None:
+        self._weights: dict[str, tuple[str, float]] = {}
+        for topic, words in self.topics.items():
+            for word, weight in words.items():
+                if weight > self._weights.get(word, ("", 0.0))[1]:
+                    self._weights[word] = (topic, weight)
+
+    def classify(self, text: str) -> Verdict | None:
+        score = 0.0
+        matched: list[str] = []
+        for token in set(tokenize(text)):
+            if token in self._weights:
+                score += self._weights[token][1]
+                matched.append(token)
+        if len(matched) < self.min_matches or score < self.threshold:
+            return None
+        topics = sorted({self._weights[word][0] for word in matched})
+        return Verdict(
+            is_relevant_input=True,
+            reasoning=f"local keyword match ({', '.join(sorted(matched))}) on {', '.join(topics)}",
+        )
+
+    def observe(self, text: str, is_relevant: bool) -> None:
+        pass
+
+
+@dataclass
+class LinearPrefilter:
+    """Logistic regression over hashed unigrams and bigrams, trained online on the
+    verdicts the guardrail LLM has already returned.
+    """
+
+    dims: int = 2**18
+    learning_rate: float = 0.5
+    confidence: float = 0.95
+    min_examples: int = 200
+    seen: int = 0
+    accepts: bool = False
+
+    def __post_init__(self) -> None:
+        self._weights = [0.0] * self.dims
+        self._bias = 0.0
+
+    def _features(self, text: str) -> list[int]:
+        tokens = tokenize(text)
+        grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        return sorted({zlib.crc32(g.encode()) % self.dims for g in grams})
+
+    def probability(self, text: str) -> float:
+        z = self._bias + sum(self._weights[i] for i in self._features(text))
+        return 1.0 / (1.0 + math.exp(-max(min(z, 30.0), -30.0)))
+
+    def classify(self, text: str) -> Verdict | None:
+        if self.seen < self.min_examples:
+            return None
+        p = self.probability(text)
+        if p >= self.confidence:
+            return Verdict(is_relevant_input=True, reasoning=f"local model p={p:.2f}")
+        if p <= 1.0 - self.confidence:
+            return Verdict(is_relevant_input=False, reasoning=f"local model p={p:.2f}")
+        return None
+
+    def observe(self, text: str, is_relevant: bool) -> None:
+        features = self._features(text)
+        if not features:
+            return
+        error = float(is_relevant) - self.probability(text)
+        step = self.learning_rate * error / math.sqrt(len(features))
+        for i in features:
+            self._weights[i] += step
+        self._bias += self.learning_rate * error * 0.1
+        self.seen += 1
+
+
+@dataclass
+class PrefilterChain:
+    """Asks each stage in order and counts how often the LLM was still needed.
+
+    Any stage may reject, but only stages with `accepts` set (the calibrated
+    keyword stage) may wave an input through; for the others a "relevant"
+    verdict still goes to the LLM, unless `accept` is set for every stage. The
+    online model hasn't seen enough off-topic text that mentions the topics to
+    be trusted with that by default.
+    """
+
+    stages: list[Prefilter]
+    accept: bool = False
+    local_verdicts: int = 0
+    llm_calls: int = 0
+
+    def classify(self, text: str) -> Verdict | None:
+        for stage in self.stages:
+            verdict = stage.classify(text)
+            if verdict is not None and (not verdict.is_relevant_input or self.accept or stage.accepts):
+                self.local_verdicts += 1
+                return verdict
+        self.llm_calls += 1
+        return None
+
+    def observe(self, text: str, is_relevant: bool) -> None:
+        for stage in self.stages:
+            stage.observe(text, is_relevant)
+
+    def stats(self) -> dict[str, float]:
+        total = self.local_verdicts + self.llm_calls
+        return {
+            "requests": total,
+            "local_verdicts": self.local_verdicts,
+            "llm_calls": self.llm_calls,
+            "llm_call_rate": round(self.llm_calls / total, 4) if total else 0.0,
+        }
@@ -0,0 +1,349 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections.abc import AsyncIterator
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Literal
+
+from agents import Model, ModelProvider, ModelResponse, ModelSettings, TResponseInputItem, Usage, UserError
+from openai.types.responses import (
+    Response,
+    ResponseCompletedEvent,
+    ResponseOutputItem,
+    ResponseOutputMessage,
+    ResponseTextDeltaEvent,
+    ResponseUsage,
+)
+from openai.types.responses.response_usage import InputTokensDetails, OutputTokensDetails
+from pydantic import TypeAdapter
+
+ReplayMode = Literal["record", "replay", "auto", "live"]
+
+_output_item = TypeAdapter(ResponseOutputItem)
+
+
+class ReplayMissError(UserError):
+    """Replay mode got a request that is not in the cassette."""
+
+
+class Cassette:
+    """Recorded model responses in a JSON Lines file, one response per line.
+
+    Responses are keyed by a hash of everything the model sees. A request that was
+    recorded several times is answered with the recordings in order, and the last
+    one is repeated after that.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._entries: dict[str, list[dict[str, Any]]] = {}
+        self._next: dict[str, int] = {}
+        if self.path.exists():
+            with self.path.open(encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries.setdefault(entry["key"], []).append(entry)
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        entries = self._entries.get(key)
+        if not entries:
+            return None
+        index = self._next.get(key, 0)
+        self._next[key] = index + 1
+        return entries[min(index, len(entries) - 1)]
+
+    def add(self, entry: dict[str, Any]) -> None:
+        self._entries.setdefault(entry["key"], []).append(entry)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def request_key(
+    model: str,
+    system_instructions: str | None,
+    input: str | list[TResponseInputItem],
+    tools: list[Any],
+    output_schema: Any,
+    handoffs: list[Any],
+) -> str:
+    payload = [
+        model,
+        system_instructions,
+        input,
+        sorted(getattr(tool, "name", "") for tool in tools),
+        output_schema.json_schema() if output_schema is not None and not output_schema.is_plain_text() else None,
+        sorted(getattr(h, "tool_name", "") for h in handoffs),
+    ]
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()[:24]
+
+
+def _usage_dict(usage: Usage) -> dict[str, Any]:
+    details = getattr(usage, "input_tokens_details", None)
+    return {
+        "input_tokens": usage.input_tokens,
+        "output_tokens": usage.output_tokens,
+        "total_tokens": usage.total_tokens,
+        "cached_tokens": getattr(details, "cached_tokens", 0) or 0,
+    }
+
+
+def _response_usage(usage: dict[str, Any]) -> ResponseUsage:
+    return ResponseUsage(
+        input_tokens=usage["input_tokens"],
+        output_tokens=usage["output_tokens"],
+        total_tokens=usage["total_tokens"],
+        input_tokens_details=InputTokensDetails(cached_tokens=usage["cached_tokens"]),
+        output_tokens_details=OutputTokensDetails(reasoning_tokens=0),
+    )
+
+
+class ModelTime:
+    """Wall time during which at least one model call was in flight.
+
+    Calls that overlap (a guardrail next to the agent, parallel tool calls) are
+    counted once, so `latency - busy` is the time spent outside the model.
+    """
+
+    def __init__(self) -> None:
+        self.intervals: list[tuple[float, float]] = []
+
+    @property
+    def calls(self) -> int:
+        return len(self.intervals)
+
+    @property
+    def busy(self) -> float:
+        total, end = 0.0, float("-inf")
+        for start, stop in sorted(self.intervals):
+            if stop > end:
+                total += stop - max(start, end)
+                end = stop
+        return total
+
+
+# Set by a caller (e.g. a benchmark) to collect the model time of one run
+model_time: ContextVar[ModelTime | None] = ContextVar("model_time", default=None)
+
+
+class ReplayModel(Model):
+    """Records a model's responses to a cassette, or answers from the cassette.
+
+    - `record`: every call goes to `inner` and the response is appended.
+    - `replay`: every call is answered from the cassette; a request that was never
+      recorded raises `ReplayMissError`. No network, no API key.
+    - `auto`: replay what is recorded, record the rest.
+    - `live`: every call goes to `inner` and nothing is recorded.
+
+    Every call is also added to `model_time` when a caller has set one.
+
+    `speed` scales replayed latency: 0 answers at once (only framework time is
+    left), 1 waits as long as the recorded call took.
+    """
+
+    def __init__(
+        self,
+        inner: Model | None,
+        cassette: Cassette,
+        *,
+        mode: ReplayMode = "replay",
+        name: str | None = None,
+        speed: float = 0.0,
+    ):
+        if inner is None and mode != "replay":
+            raise UserError(f"ReplayModel needs a model to {mode} from")
+        self.inner = inner
+        self.cassette = cassette
+        self.mode = mode
+        self.model = name or str(getattr(inner, "model", "model"))
+        self.speed = speed
+
+    def _recorded(self, key: str) -> dict[str, Any] | None:
+        if self.mode in ("record", "live"):
+            return None
+        entry = self.cassette.get(key)
+        if entry is None and self.mode == "replay":
+            raise ReplayMissError(
+                f"No recorded response for {self.model} (key {key}) in {self.cassette.path}; record it again"
+            )
+        return entry
+
+    def _record(self, key: str, output: list[Any], usage: Usage, latency: float) -> None:
+        if self.mode == "live":
+            return
+        self.cassette.add({
+            "key": key,
+            "model": self.model,
+            "latency": round(latency, 4),
+            "output": [item.model_dump(exclude_none=True) for item in output],
+            "usage": _usage_dict(usage),
+        })
+
+    def _response(self, entry: dict[str, Any]) -> ModelResponse:
+        usage = entry["usage"]
+        return ModelResponse(
+            output=[_output_item.validate_python(item) for item in entry["output"]],
+            usage=Usage(
+                requests=1,
+                input_tokens=usage["input_tokens"],
+                output_tokens=usage["output_tokens"],
+                total_tokens=usage["total_tokens"],
+                input_tokens_details=InputTokensDetails(cached_tokens=usage["cached_tokens"]),
+                output_tokens_details=OutputTokensDetails(reasoning_tokens=0),
+            ),
+            response_id=None,
+        )
+
+    async def _wait(self, entry: dict[str, Any]) -> None:
+        if self.speed:
+            await asyncio.sleep(entry.get("latency", 0) * self.speed)
+
+    async def get_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Any],
+        output_schema: Any,
+        handoffs: list[Any],
+        *args: Any,
+        **kwargs: Any,
+    ) -> ModelResponse:
+        key = request_key(self.model, system_instructions, input, tools, output_schema, handoffs)
+        timer = model_time.get()
+        start = time.perf_counter()
+        try:
+            entry = self._recorded(key)
+            if entry is not None:
+                await self._wait(entry)
+                return self._response(entry)
+            response = await self.inner.get_response(
+                system_instructions, input, model_settings, tools, output_schema, handoffs, *args, **kwargs
+            )
+            self._record(key, response.output, response.usage, time.perf_counter() - start)
+            return response
+        finally:
+            if timer is not None:
+                timer.intervals.append((start, time.perf_counter()))
+
+    async def stream_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Any],
+        output_schema: Any,
+        handoffs: list[Any],
+        *args: Any,
+        **kwargs: Any,
+    ) -> AsyncIterator[Any]:
+        key = request_key(self.model, system_instructions, input, tools, output_schema, handoffs)
+        timer = model_time.get()
+        start = time.perf_counter()
+        try:
+            entry = self._recorded(key)
+            if entry is not None:
+                await self._wait(entry)
+                for event in self._events(entry):
+                    yield event
+                return
+            async for event in self.inner.stream_response(
+                system_instructions, input, model_settings, tools, output_schema, handoffs, *args, **kwargs
+            ):
+                if isinstance(event, ResponseCompletedEvent):
+                    usage = event.response.usage
+                    self._record(
+                        key,
+                        event.response.output,
+                        Usage(
+                            requests=1,
+                            input_tokens=usage.input_tokens if usage else 0,
+                            output_tokens=usage.output_tokens if usage else 0,
+                            total_tokens=usage.total_tokens if usage else 0,
+                            input_tokens_details=usage.input_tokens_details if usage else InputTokensDetails(cached_tokens=0),
+                        ),
+                        time.perf_counter() - start,
+                    )
+                yield event
+        finally:
+            if timer is not None:
+                timer.intervals.append((start, time.perf_counter()))
+
+    def _events(self, entry: dict[str, Any]) -> list[Any]:
+        # Text deltas followed by the completed response, which is all the runner reads
+        response = self._response(entry)
+        events: list[Any] = []
+        sequence = 0
+        for index, item in enumerate(response.output):
+            if not isinstance(item, ResponseOutputMessage):
+                continue
+            for part_index, part in enumerate(item.content):
+                text = getattr(part, "text", None)
+                if not text:
+                    continue
+                for chunk in _chunks(text):
+                    events.append(ResponseTextDeltaEvent.model_construct(
+                        content_index=part_index,
+                        delta=chunk,
+                        item_id=item.id,
+                        output_index=index,
+                        sequence_number=sequence,
+                        logprobs=[],
+                        type="response.output_text.delta",
+                    ))
+                    sequence += 1
+        completed = Response.model_construct(
+            id="__replay__",
+            created_at=time.time(),
+            model=self.model,
+            object="response",
+            output=response.output,
+            parallel_tool_calls=False,
+            tool_choice="auto",
+            tools=[],
+            usage=_response_usage(entry["usage"]),
+        )
+        events.append(ResponseCompletedEvent.model_construct(
+            response=completed, sequence_number=sequence, type="response.completed"
+        ))
+        return events
+
+
+def _chunks(text: str, size: int = 64) -> list[str]:
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+class ReplayModelProvider(ModelProvider):
+    """`ReplayModel`s for a `RunConfig`, e.g.
+
+        RunConfig(model_provider=ReplayModelProvider("run.jsonl", OpenAIProvider(), mode="auto"))
+
+    Like any provider it only applies to agents whose `model` is a name or unset;
+    agents built with a model instance can wrap it in `ReplayModel` directly.
+    """
+
+    def __init__(
+        self,
+        cassette: str | Path | Cassette,
+        base: ModelProvider | None = None,
+        *,
+        mode: ReplayMode = "replay",
+        speed: float = 0.0,
+    ):
+        self.cassette = cassette if isinstance(cassette, Cassette) else Cassette(cassette)
+        self.base = base
+        self.mode = mode
+        self.speed = speed
+
+    def get_model(self, model_name: str | None) -> Model:
+        inner = self.base.get_model(model_name) if self.base is not None else None
+        return ReplayModel(inner, self.cassette, mode=self.mode, name=model_name, speed=self.speed)
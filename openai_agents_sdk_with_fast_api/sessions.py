@@ -0,0 +1,158 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+from collections import OrderedDict
+from typing import Protocol
+
+from agents import TResponseInputItem
+
+logger = logging.getLogger("chat.sessions")
+
+
+class SessionStore(Protocol):
+    """Conversation items keyed by `Metadata.session_id`."""
+
+    async def load(self, session_id: str) -> list[TResponseInputItem]: ...
+
+    async def append(self, session_id: str, items: list[TResponseInputItem]) -> None: ...
+
+    async def close(self) -> None: ...
+
+
+class MemorySessionStore:
+    """Keeps the most recently used sessions in process memory."""
+
+    def __init__(self, max_sessions: int = 10_000):
+        self.max_sessions = max_sessions
+        self._sessions: OrderedDict[str, list[TResponseInputItem]] = OrderedDict()
+
+    async def load(self, session_id: str) -> list[TResponseInputItem]:
+        items = self._sessions.get(session_id)
+        if items is None:
+            return []
+        self._sessions.move_to_end(session_id)
+        return list(items)
+
+    async def append(self, session_id: str, items: list[TResponseInputItem]) -> None:
+        self._sessions.setdefault(session_id, []).extend(items)
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    async def close(self) -> None:
+        pass
+
+
+class SQLiteSessionStore:
+    """Append-only SQLite store with a write-behind buffer.
+
+    `append` only buffers the new items; a background task writes them in batches,
+    so persistence never sits on the response path. `load` merges rows already on
+    disk with anything still buffered.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 0.05):
+        self.flush_interval = flush_interval
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS session_items ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " session_id TEXT NOT NULL,"
+            " item TEXT NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS session_items_session ON session_items (session_id, id)"
+        )
+        self._db.commit()
+        self._lock = asyncio.Lock()
+        self._pending: dict[str, list[TResponseInputItem]] = {}
+        self._flushing: dict[str, list[TResponseInputItem]] = {}
+        self._wakeup = asyncio.Event()
+        self._flusher: asyncio.Task[None] | None = None
+
+    def _read(self, session_id: str) -> list[TResponseInputItem]:
+        rows = self._db.execute(
+            "SELECT item FROM session_items WHERE session_id = ? ORDER BY id", (session_id,)
+        )
+        return [json.loads(row[0]) for row in rows]
+
+    def _write(self, rows: list[tuple[str, str]]) -> None:
+        self._db.executemany("INSERT INTO session_items (session_id, item) VALUES (?, ?)", rows)
+        self._db.commit()
+
+    async def load(self, session_id: str) -> list[TResponseInputItem]:
+        async with self._lock:
+            items = await asyncio.to_thread(self._read, session_id)
+            return items + self._flushing.get(session_id, []) + self._pending.get(session_id, [])
+
+    async def append(self, session_id: str, items: list[TResponseInputItem]) -> None:
+        if not items:
+            return
+        self._pending.setdefault(session_id, []).extend(items)
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_loop())
+        self._wakeup.set()
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            # Let appends from concurrent requests pile up into one batch
+            await asyncio.sleep(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning("session flush failed, will retry", exc_info=e)
+                self._wakeup.set()
+
+    async def flush(self) -> None:
+        async with self._lock:
+            await self._flush()
+
+    async def _flush(self) -> None:
+        if not self._pending:
+            return
+        self._flushing, self._pending = self._pending, {}
+        rows = [
+            (session_id, json.dumps(item, default=str))
+            for session_id, items in self._flushing.items()
+            for item in items
+        ]
+        try:
+            await asyncio.to_thread(self._write, rows)
+        except Exception:
+            # Put the batch back in front of anything appended meanwhile
+            for session_id, items in self._flushing.items():
+                self._pending[session_id] = items + self._pending.get(session_id, [])
+            raise
+        finally:
+            self._flushing = {}
+
+    async def close(self, attempts: int = 3) -> None:
+        """Stop the background flusher, write out what is still buffered and close the DB."""
+        # Waiting for the lock lets a write that is already in its thread finish
+        # first, so the flusher is only ever cancelled between writes
+        async with self._lock:
+            if self._flusher is not None:
+                self._flusher.cancel()
+            for _ in range(attempts):
+                if not self._pending:
+                    break
+                try:
+                    await self._flush()
+                except Exception as e:
+                    logger.warning("session flush failed at close", exc_info=e)
+            if self._pending:
+                logger.error("dropping %d unsaved session items at close", sum(map(len, self._pending.values())))
+            self._db.close()
+
+
+def session_store_from_env() -> SessionStore:
+    """`SESSION_STORE=memory` (default) or `SESSION_STORE=sqlite:///path/to/sessions.db`."""
+    url = os.getenv("SESSION_STORE", "memory")
+    if url.startswith("sqlite:///"):
+        return SQLiteSessionStore(url.removeprefix("sqlite:///"))
+    return MemorySessionStore(int(os.getenv("SESSION_MAX_SESSIONS", "10000")))
@@ -0,0 +1,216 @@
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any
+
+from agents import (
+    Agent,
+    InputGuardrailTripwireTriggered,
+    RunContextWrapper,
+    RunResult,
+    Runner,
+    TResponseInputItem,
+)
+from agents.stream_events import StreamEvent
+from openai.types.responses import ResponseTextDeltaEvent
+
+from metrics import metrics
+
+
+@dataclass
+class GuardrailTiming:
+    """Per-request timings of a speculative guardrail run, in milliseconds."""
+
+    mode: str
+    guardrail_ms: float = 0.0
+    first_token_ms: float | None = None
+    """When the main agent produced its first token."""
+    delivered_ms: float | None = None
+    """When that first token was released to the caller."""
+    total_ms: float = 0.0
+    tripwire_triggered: bool = False
+    buffered_events: int = 0
+
+    @property
+    def saved_ms(self) -> float | None:
+        """Time-to-first-token won back compared to running the guardrail first."""
+        if self.first_token_ms is None or self.delivered_ms is None:
+            return None
+        return self.guardrail_ms + self.first_token_ms - self.delivered_ms
+
+
+@dataclass
+class GuardrailTimings:
+    """Bounded log of the most recent speculative runs."""
+
+    maxlen: int = 500
+    records: deque[GuardrailTiming] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.records = deque(maxlen=self.maxlen)
+
+    def add(self, timing: GuardrailTiming) -> None:
+        self.records.append(timing)
+
+    def summary(self) -> dict[str, Any]:
+        records = list(self.records)
+        saved = [r.saved_ms for r in records if r.saved_ms is not None]
+        return {
+            "requests": len(records),
+            "tripwires": sum(r.tripwire_triggered for r in records),
+            "avg_guardrail_ms": _avg([r.guardrail_ms for r in records]),
+            "avg_total_ms": _avg([r.total_ms for r in records]),
+            "avg_ttft_saved_ms": _avg(saved),
+        }
+
+
+def _avg(values: list[float]) -> float | None:
+    return round(sum(values) / len(values), 2) if values else None
+
+
+timings = GuardrailTimings()
+
+
+def _ms(start: float) -> float:
+    return (perf_counter() - start) * 1000
+
+
+async def check_guardrails(
+    agent: Agent[Any],
+    input: str | list[TResponseInputItem],
+    context: RunContextWrapper[Any],
+) -> None:
+    """Run every input guardrail of `agent` and raise on the first tripwire."""
+    start = perf_counter()
+    tasks = [
+        asyncio.create_task(guardrail.run(agent, input, context))
+        for guardrail in agent.input_guardrails
+    ]
+    try:
+        for done in asyncio.as_completed(tasks):
+            result = await done
+            if result.output.tripwire_triggered:
+                raise InputGuardrailTripwireTriggered(result)
+    finally:
+        for task in tasks:
+            task.cancel()
+        metrics.observe("agent_phase_seconds", perf_counter() - start, phase="guardrail", agent=agent.name)
+
+
+async def run_speculative(
+    agent: Agent[Any],
+    input: str | list[TResponseInputItem],
+    *,
+    context: Any = None,
+    **kwargs: Any,
+) -> RunResult:
+    """`Runner.run` with the agent's input guardrails running alongside the agent.
+
+    The main run is cancelled as soon as a tripwire fires, instead of being left to
+    finish in the background.
+    """
+    timing = GuardrailTiming(mode="run")
+    start = perf_counter()
+    main_task = asyncio.create_task(
+        Runner.run(agent.clone(input_guardrails=[]), input, context=context, **kwargs)
+    )
+    try:
+        await check_guardrails(agent, input, RunContextWrapper(context=context))
+        timing.guardrail_ms = _ms(start)
+        return await main_task
+    except InputGuardrailTripwireTriggered:
+        timing.guardrail_ms = _ms(start)
+        timing.tripwire_triggered = True
+        raise
+    finally:
+        main_task.cancel()
+        timing.total_ms = _ms(start)
+        timings.add(timing)
+
+
+async def stream_speculative(
+    agent: Agent[Any],
+    input: str | list[TResponseInputItem],
+    *,
+    context: Any = None,
+    **kwargs: Any,
+) -> AsyncIterator[StreamEvent]:
+    """`Runner.run_streamed` with the agent's input guardrails running alongside the agent.
+
+    Events are held back until every guardrail has passed. If a tripwire fires the
+    streamed run is cancelled and `InputGuardrailTripwireTriggered` is raised before
+    anything was yielded.
+    """
+    timing = GuardrailTiming(mode="stream")
+    start = perf_counter()
+    result = Runner.run_streamed(
+        agent.clone(input_guardrails=[]), input, context=context, **kwargs
+    )
+    guard_task = asyncio.create_task(
+        check_guardrails(agent, input, RunContextWrapper(context=context))
+    )
+    events = result.stream_events()
+    next_event: asyncio.Future[StreamEvent] | None = asyncio.ensure_future(anext(events))
+    buffer: list[StreamEvent] = []
+
+    def is_token(event: StreamEvent) -> bool:
+        return event.type == "raw_response_event" and isinstance(
+            event.data, ResponseTextDeltaEvent
+        )
+
+    try:
+        # Phase 1: collect events until the guardrails have a verdict.
+        while not guard_task.done():
+            waiting = {guard_task} if next_event is None else {guard_task, next_event}
+            await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+            if next_event is not None and next_event.done():
+                try:
+                    event = next_event.result()
+                except StopAsyncIteration:
+                    next_event = None
+                    continue
+                if timing.first_token_ms is None and is_token(event):
+                    timing.first_token_ms = _ms(start)
+                buffer.append(event)
+                next_event = asyncio.ensure_future(anext(events))
+
+        timing.guardrail_ms = _ms(start)
+        try:
+            guard_task.result()
+        except InputGuardrailTripwireTriggered:
+            timing.tripwire_triggered = True
+            raise
+
+        # Phase 2: release the buffer, then pass events straight through.
+        timing.buffered_events = len(buffer)
+        for event in buffer:
+            if timing.delivered_ms is None and is_token(event):
+                timing.delivered_ms = _ms(start)
+            yield event
+        buffer.clear()
+
+        while next_event is not None:
+            try:
+                event = await next_event
+            except StopAsyncIteration:
+                break
+            if is_token(event):
+                if timing.first_token_ms is None:
+                    timing.first_token_ms = _ms(start)
+                if timing.delivered_ms is None:
+                    timing.delivered_ms = timing.first_token_ms
+            yield event
+            next_event = asyncio.ensure_future(anext(events))
+        next_event = None
+    finally:
+        guard_task.cancel()
+        if next_event is not None:
+            # The stream may still end with StopAsyncIteration; don't log it as unhandled
+            next_event.add_done_callback(lambda f: f.cancelled() or f.exception())
+            next_event.cancel()
+        if not result.is_complete:
+            result.cancel()
+        timing.total_ms = _ms(start)
+        timings.add(timing)
@@ -0,0 +1,119 @@
+import asyncio
+import json
+import logging
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from typing import Any
+
+_END = object()
+logger = logging.getLogger("chat.sse")
+
+
+@dataclass
+class SSEError:
+    """Sent to the client as an `event: error` frame instead of raising mid-stream."""
+
+    status: int
+    detail: str
+
+
+class SSEEncoder:
+    """One JSON encoder reused for every frame; frames are built as bytes."""
+
+    def __init__(self) -> None:
+        self._json = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+    def data(self, payload: dict[str, Any]) -> bytes:
+        return b"data: " + self._json.encode(payload).encode() + b"\n\n"
+
+    def error(self, error: SSEError) -> bytes:
+        payload = {"status": error.status, "detail": error.detail}
+        return b"event: error\ndata: " + self._json.encode(payload).encode() + b"\n\n"
+
+
+encoder = SSEEncoder()
+
+
+async def sse_stream(
+    source: AsyncIterator[dict[str, Any] | SSEError],
+    *,
+    max_chars: int = 256,
+    max_delay: float = 0.05,
+    queue_size: int = 64,
+) -> AsyncIterator[bytes]:
+    """Turn `{"chunk": ...}` payloads into SSE frames.
+
+    - The first chunk of the main agent and of each sub-agent call goes out at
+      once, so coalescing never delays the first token.
+    - Later chunks with the same other keys (the main agent, or one sub-agent
+      call) are joined into one frame, sent once `max_chars` is reached or
+      `max_delay` seconds after the first chunk was buffered.
+    - `source` is read by a separate task into a queue of `queue_size` frames.
+      When the client reads slowly the queue fills up and reading stops, instead
+      of buffering without limit.
+    - When the client goes away the server cancels this generator, which cancels
+      the reader and closes `source` (and with it the agent run).
+    - An exception from `source` becomes an `event: error` frame.
+    """
+    queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=queue_size)
+
+    async def read() -> None:
+        try:
+            async for payload in source:
+                await queue.put(payload)
+            await queue.put(_END)
+        except Exception as e:
+            await queue.put(e)
+        finally:
+            await source.aclose()
+
+    reader = asyncio.create_task(read())
+    loop = asyncio.get_running_loop()
+    # Pending text per set of tags (main agent, or one sub-agent call)
+    buffers: dict[tuple[Any, ...], list[str]] = {}
+    sizes: dict[tuple[Any, ...], int] = {}
+    started: set[tuple[Any, ...]] = set()
+    deadline = 0.0
+
+    def flush(key: tuple[Any, ...]) -> bytes:
+        sizes.pop(key)
+        return encoder.data({"chunk": "".join(buffers.pop(key)), **dict(key)})
+
+    try:
+        while True:
+            try:
+                if buffers:
+                    item = await asyncio.wait_for(queue.get(), max(0.0, deadline - loop.time()))
+                else:
+                    item = await queue.get()
+            except asyncio.TimeoutError:
+                for key in list(buffers):
+                    yield flush(key)
+                continue
+
+            if isinstance(item, dict):
+                key = tuple((k, v) for k, v in item.items() if k != "chunk")
+                if key not in started:
+                    started.add(key)
+                    yield encoder.data(item)
+                    continue
+                if not buffers:
+                    deadline = loop.time() + max_delay
+                buffers.setdefault(key, []).append(item["chunk"])
+                sizes[key] = sizes.get(key, 0) + len(item["chunk"])
+                if sizes[key] >= max_chars:
+                    yield flush(key)
+                continue
+
+            for key in list(buffers):
+                yield flush(key)
+            if item is _END:
+                break
+            if isinstance(item, SSEError):
+                yield encoder.error(item)
+            elif isinstance(item, Exception):
+                logger.error("stream failed", exc_info=item)
+                yield encoder.error(SSEError(status=500, detail="Internal error while streaming"))
+                break
+    finally:
+        reader.cancel()
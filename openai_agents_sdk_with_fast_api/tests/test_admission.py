@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+import admission
+from admission import AdmissionController, Conversations, Rejected
+
+
+def test_slot_granted_as_the_wait_times_out_is_handed_on(monkeypatch):
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, user_rate=100, user_burst=100, max_wait=1)
+        holder = await controller.acquire("a")
+
+        async def grant_then_time_out(awaitable, timeout):
+            # The holder finishes in the same instant the waiter gives up
+            holder.release()
+            awaitable.cancel()
+            raise asyncio.TimeoutError
+
+        monkeypatch.setattr(admission.asyncio, "wait_for", grant_then_time_out)
+        with pytest.raises(Rejected) as rejected:
+            await controller.acquire("b")
+        assert rejected.value.reason == "queue_timeout"
+        monkeypatch.undo()
+
+        assert controller.in_flight == 0
+        ticket = await asyncio.wait_for(controller.acquire("c"), 0.1)
+        assert controller.in_flight == 1
+        ticket.release()
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_hands_its_slot_on():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, user_rate=100, user_burst=100)
+        holder = await controller.acquire("a")
+        waiting = asyncio.create_task(controller.acquire("b"))
+        await asyncio.sleep(0)
+        assert controller.queued == 1
+        # The client leaves just as the slot comes free
+        waiting.cancel()
+        holder.release()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        assert controller.in_flight == 0
+        assert controller.queued == 0
+
+    asyncio.run(scenario())
+
+
+def test_conversations_forget_the_oldest():
+    conversations = Conversations(max_size=2)
+    conversations.add("u", "s1")
+    conversations.add("u", "s2")
+    conversations.add("u", "s1")
+    conversations.add("u", "s3")
+    assert ("u", "s1") in conversations
+    assert ("u", "s2") not in conversations
+    assert ("other", "s1") not in conversations
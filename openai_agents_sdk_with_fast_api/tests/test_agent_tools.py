@@ -0,0 +1,24 @@
+import asyncio
+
+from agent_tools import with_sub_agent_events
+
+
+def test_a_slow_consumer_holds_back_the_parent_stream():
+    produced = 0
+
+    async def start():
+        nonlocal produced
+        for i in range(1000):
+            produced += 1
+            yield i
+
+    async def scenario():
+        events = with_sub_agent_events(start, max_buffered=8)
+        assert await anext(events) == 0
+        await asyncio.sleep(0.05)
+        # One event handed out, the buffer full and one waiting to be put
+        assert produced <= 10
+        rest = [event async for event in events]
+        assert rest == list(range(1, 1000))
+
+    asyncio.run(scenario())
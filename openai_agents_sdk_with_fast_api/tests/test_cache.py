@@ -0,0 +1,39 @@
+import asyncio
+
+from cache import ResponseCache
+
+VECTORS = {
+    "what is an agent": [1.0, 0.0, 0.0],
+    "what is an ai agent": [0.99, 0.14, 0.0],
+    "what are agents": [0.98, 0.0, 0.2],
+}
+
+
+async def embed(text: str) -> list[float]:
+    return VECTORS[text]
+
+
+def test_expired_best_match_does_not_hide_a_live_runner_up():
+    async def scenario():
+        cache = ResponseCache("v1", embed=embed, threshold=0.9, capacity=4)
+        cache.store(await cache.lookup("what is an ai agent"), "stale", "a")
+        cache.store(await cache.lookup("what are agents"), "fresh", "a")
+        cache._entries[cache._key("what is an ai agent")].expires = 0.0
+
+        lookup = await cache.lookup("what is an agent")
+        assert lookup.tier == "semantic"
+        assert lookup.entry.reply == "fresh"
+        assert cache.stats()["entries"] == 1  # the expired one was evicted on the way
+
+    asyncio.run(scenario())
+
+
+def test_nothing_over_the_threshold_is_a_miss():
+    async def scenario():
+        cache = ResponseCache("v1", embed=embed, threshold=0.999, capacity=4)
+        cache.store(await cache.lookup("what is an ai agent"), "reply", "a")
+        lookup = await cache.lookup("what is an agent")
+        assert lookup.entry is None
+        assert cache.misses == 2
+
+    asyncio.run(scenario())
@@ -0,0 +1,14 @@
+from collections import OrderedDict
+
+from metrics import MetricsRunner
+
+
+def test_wrapper_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(MetricsRunner, "max_wrappers", 2)
+    cache: OrderedDict = OrderedDict()
+    models = [object() for _ in range(3)]
+    wrappers = [MetricsRunner._wrapper(cache, "agent", model, object) for model in models]
+
+    assert len(cache) == 2
+    assert MetricsRunner._wrapper(cache, "agent", models[2], object) is wrappers[2]
+    assert all(entry[0] is not models[0] for entry in cache.values())
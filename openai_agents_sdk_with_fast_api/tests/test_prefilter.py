@@ -0,0 +1,37 @@
+from prefilter import KeywordPrefilter, LinearPrefilter, PrefilterChain, Verdict
+
+
+def test_one_keyword_is_not_enough():
+    keywords = KeywordPrefilter()
+    assert keywords.classify("Which android phone should I buy for my mom?") is None
+    assert keywords.classify("Tell me a joke about openai") is None
+    assert keywords.classify("Tell me a joke about openai agents") is None
+    assert keywords.classify("How do handoffs work in the OpenAI Agents SDK?").is_relevant_input
+
+
+class Fixed:
+    def __init__(self, verdict: Verdict | None, accepts: bool = False):
+        self.verdict = verdict
+        self.accepts = accepts
+
+    def classify(self, text: str) -> Verdict | None:
+        return self.verdict
+
+    def observe(self, text: str, is_relevant: bool) -> None:
+        pass
+
+
+def test_chain_only_rejects_unless_accept_is_set():
+    relevant = Verdict(is_relevant_input=True, reasoning="")
+    irrelevant = Verdict(is_relevant_input=False, reasoning="")
+    assert PrefilterChain([Fixed(relevant)]).classify("x") is None
+    assert PrefilterChain([Fixed(relevant), Fixed(irrelevant)]).classify("x") is irrelevant
+    assert PrefilterChain([Fixed(relevant)], accept=True).classify("x") is relevant
+    assert PrefilterChain([Fixed(relevant, accepts=True)]).classify("x") is relevant
+
+
+def test_default_chain_skips_the_llm_for_clear_keyword_matches():
+    chain = PrefilterChain([KeywordPrefilter(), LinearPrefilter()])
+    assert chain.classify("How can I deploy my agent on Kubernetes?").is_relevant_input
+    assert chain.classify("Which android phone should I buy for my mom?") is None
+    assert chain.stats()["local_verdicts"] == 1
@@ -0,0 +1,40 @@
+import asyncio
+import threading
+import time
+
+from sessions import SQLiteSessionStore
+
+
+class SlowStore(SQLiteSessionStore):
+    """Each write takes a while in its thread, and says when it has started."""
+
+    def __init__(self, path: str):
+        super().__init__(path, flush_interval=0)
+        self.writing = threading.Event()
+
+    def _write(self, rows):
+        self.writing.set()
+        time.sleep(0.2)
+        super()._write(rows)
+
+
+def test_close_during_a_write_keeps_every_item(tmp_path):
+    path = str(tmp_path / "sessions.db")
+
+    async def scenario():
+        store = SlowStore(path)
+        await store.append("s", [{"role": "user", "content": "first"}])
+        await asyncio.to_thread(store.writing.wait, 1)
+        # Appended while the first batch is still being written
+        await store.append("s", [{"role": "assistant", "content": "second"}])
+        await store.close()
+
+    asyncio.run(scenario())
+
+    async def reopen():
+        store = SQLiteSessionStore(path)
+        items = await store.load("s")
+        await store.close()
+        return items
+
+    assert [item["content"] for item in asyncio.run(reopen())] == ["first", "second"]
@@ -0,0 +1,23 @@
+import asyncio
+import time
+
+from sse import sse_stream
+
+
+def test_first_chunk_is_not_held_back():
+    async def source():
+        yield {"chunk": "Hel"}
+        await asyncio.sleep(0.2)
+        yield {"chunk": "lo"}
+        yield {"chunk": "!"}
+
+    async def scenario():
+        start = time.perf_counter()
+        frames = []
+        async for frame in sse_stream(source(), max_delay=0.05):
+            frames.append((frame, time.perf_counter() - start))
+        return frames
+
+    frames = asyncio.run(scenario())
+    assert [frame for frame, _ in frames] == [b'data: {"chunk":"Hel"}\n\n', b'data: {"chunk":"lo!"}\n\n']
+    assert frames[0][1] < 0.03
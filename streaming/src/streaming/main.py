@@ -1,8 +1,10 @@
 import chainlit as cl
 from dotenv import load_dotenv, find_dotenv
 import os
-from agents import Agent, Runner, AsyncOpenAI, OpenAIChatCompletionsModel
+from agents import Agent, AsyncOpenAI, OpenAIChatCompletionsModel
 from agents.run import RunConfig
+from agent_runtime.executor import executor
+from agent_runtime.history import HistoryManager
 load_dotenv(find_dotenv())
 from openai.types.responses import ResponseTextDeltaEvent
 gemini_api_key = os.getenv("GEMINI_API_KEY")
@@ -32,7 +34,7 @@ agent1 = Agent(
 # print(result.final_output)
 @cl.on_chat_start
 async def handle_chat_start():
-    cl.user_session.set("history", [])
+    cl.user_session.set("history", HistoryManager(config))
     await cl.Message(content="Hello! I'm the panaversity Support Agent. How can I help you today?").send()
 
 @cl.on_message
@@ -41,17 +43,17 @@ async def handle_message(message: cl.Message):
     msg = cl.Message(content="")
     await msg.send()
     history.append({"role":"user","content":message.content})
-    result = Runner.run_streamed(
+    async with executor.streamed(
     agent1,
-    input=history,
+    input=history.input(),
     run_config=config,
     
-    )
-    async for event in result.stream_events():
-        if event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
-            await msg.stream_token(event.data.delta)
+    ) as result:
+        async for event in result.stream_events():
+            if event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
+                await msg.stream_token(event.data.delta)
     history.append({"role":"assistant","content":result.final_output})
-    cl.user_session.set("history", history)
+    history.compact()
     #await cl.Message(content=result.final_output).send()
 
 
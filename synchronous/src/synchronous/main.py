@@ -1,8 +1,9 @@
 import chainlit as cl
 import os
 from dotenv import load_dotenv,find_dotenv
-from agents import Agent, Runner, AsyncOpenAI, OpenAIChatCompletionsModel
+from agents import Agent, AsyncOpenAI, OpenAIChatCompletionsModel
 from agents.run import RunConfig
+from agent_runtime.executor import executor
 _:bool=load_dotenv(find_dotenv())
 gemini_api_key = os.getenv("GEMINI_API_KEY")
 
@@ -35,7 +36,7 @@ async def handle_message(message: cl.Message):
     msg = cl.Message(content="")
     await msg.send()
     history.append({"role":"user","content":message.content})
-    result = Runner.run_sync(
+    result = await executor.run(
     agent,
     input=history,
     run_config=config,
@@ -1,13 +1,16 @@
 from agents import Agent, Runner, AsyncOpenAI, set_default_openai_client, set_tracing_disabled, set_default_openai_api
 import os
 from dotenv import load_dotenv, find_dotenv
-from agents import enable_verbose_stdout_logging, function_tool
+from agents import ModelSettings
+from agent_runtime.log_sink import enable_structured_logging
+from tools.tool_executor import executor
 _:bool = load_dotenv(find_dotenv())
 gemini_api_key = os.getenv("GEMINI_API_KEY")
 set_tracing_disabled(disabled=True)
 set_default_openai_api("chat_completions")
 
-enable_verbose_stdout_logging()
+# SDK logs as sampled JSON lines, written by a background thread; LOG_LEVEL=DEBUG for the verbose ones
+enable_structured_logging()
 
 
 external_client = AsyncOpenAI(
@@ -15,12 +18,12 @@ external_client = AsyncOpenAI(
     base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
 )
 set_default_openai_client(external_client)
-@function_tool
+@executor.tool(cache_ttl=300)
 def get_current_weather(city:str)->str:
     """Return current weather of any city"""
     return "Curent weather for {city} is sunny"
 
-@function_tool
+@executor.tool(cache_ttl=300)
 def get_current_news(topic:str)->str:
     """Returns current news about a specific topic"""
     return "Latest news in {topic} is Agent Native Cloud Development"
@@ -29,9 +32,12 @@ def get_current_news(topic:str)->str:
 agent: Agent = Agent(name="Assistant", 
                     instructions="You are a helpful assistant",
                     model="gemini-2.0-flash",
-                    tools=[get_current_weather,get_current_news] 
+                    tools=[get_current_weather,get_current_news],
+                    # Both tools are independent, so ask for them in one turn and run them together
+                    model_settings=ModelSettings(parallel_tool_calls=True),
                      )
 
 result = Runner.run_sync(agent, "What is the current weather in Karachi and what is the current latest news in tech?")
 
-print(result.final_output)
\ No newline at end of file
+print(result.final_output)
+print(executor.stats())
\ No newline at end of file
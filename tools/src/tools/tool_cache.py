@@ -0,0 +1,91 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+from agents import RunContextWrapper
+
+KeyFunction = Callable[..., Hashable]
+
+
+def context_values(ctx: RunContextWrapper[Any] | None, fields: tuple[str, ...]) -> tuple[Any, ...]:
+    """Pick `fields` off the run context, whether it is an object or a dict."""
+    context = ctx.context if ctx is not None else None
+    if isinstance(context, dict):
+        return tuple(context.get(field) for field in fields)
+    return tuple(getattr(context, field, None) for field in fields)
+
+
+def default_key(**arguments: Any) -> str:
+    return json.dumps(arguments, sort_keys=True, default=repr)
+
+
+class ToolCache:
+    """Size-bounded LRU of tool results with a TTL.
+
+    Concurrent calls with the same key share one execution (single flight), and
+    failed calls are never stored.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._in_flight: dict[Hashable, asyncio.Task[Any]] = {}
+
+    def get(self, key: Hashable) -> tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        if entry[0] < time.monotonic():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, entry[1]
+
+    def put(self, key: Hashable, value: Any, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    async def get_or_call(self, key: Hashable, ttl: float, call: Callable[[], Awaitable[Any]]) -> Any:
+        found, value = self.get(key)
+        if found:
+            self.hits += 1
+            return value
+        task = self._in_flight.get(key)
+        if task is not None:
+            # Someone is already computing it, count it as a hit
+            self.hits += 1
+            return await asyncio.shield(task)
+
+        self.misses += 1
+
+        async def fill() -> Any:
+            value = await call()
+            self.put(key, value, ttl)
+            return value
+
+        task = asyncio.ensure_future(fill())
+        self._in_flight[key] = task
+        task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return await asyncio.shield(task)
+
+    def invalidate(self, key: Hashable | None = None) -> None:
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def stats(self) -> dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else None,
+        }
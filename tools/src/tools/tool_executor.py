@@ -0,0 +1,156 @@
+import asyncio
+import bisect
+import functools
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from typing import Any, Callable
+
+from agents import FunctionTool, RunContextWrapper, function_tool
+
+from tools.tool_cache import KeyFunction, ToolCache, context_values, default_key
+
+# Upper bounds of the latency buckets, in milliseconds
+BUCKETS_MS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000]
+
+
+class LatencyHistogram:
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.total_ms = 0.0
+        self.timeouts = 0
+        self.errors = 0
+
+    def observe(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.total_ms += ms
+
+    def percentile(self, pct: float) -> float | None:
+        """Upper bound of the bucket holding the given percentile."""
+        count = sum(self.counts)
+        if not count:
+            return None
+        rank = count * pct / 100
+        seen = 0
+        for bound, n in zip(BUCKETS_MS + [float("inf")], self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def summary(self) -> dict[str, Any]:
+        count = sum(self.counts)
+        return {
+            "calls": count,
+            "avg_ms": round(self.total_ms / count, 2) if count else None,
+            "p50_ms": self.percentile(50),
+            "p99_ms": self.percentile(99),
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "buckets": {f"le_{b}": n for b, n in zip(BUCKETS_MS + ["inf"], self.counts)},
+        }
+
+
+class ToolExecutor:
+    """Builds function tools that never block the event loop.
+
+    The SDK already runs every function tool call of one model turn concurrently,
+    but a sync tool (or an async one that blocks, like `time.sleep`) still stalls
+    the loop and with it every other call. Tools made with `executor.tool` run sync
+    functions on a bounded thread pool, enforce a per-tool timeout and record a
+    latency histogram per tool. Deterministic or slowly changing tools can also be
+    memoized with `cache_ttl`.
+    """
+
+    def __init__(self, max_workers: int = 8, default_timeout: float | None = 30.0):
+        self.default_timeout = default_timeout
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+        self.histograms: dict[str, LatencyHistogram] = {}
+        self.caches: dict[str, ToolCache] = {}
+
+    def tool(
+        self,
+        func: Callable[..., Any] | None = None,
+        *,
+        timeout: float | None = None,
+        blocking: bool = False,
+        cache_ttl: float | None = None,
+        cache_key: KeyFunction | None = None,
+        context_fields: tuple[str, ...] = (),
+        cache_size: int = 1024,
+        **function_tool_kwargs: Any,
+    ) -> Any:
+        """Drop-in for `@function_tool`.
+
+        Args:
+            timeout: Seconds before the call fails; defaults to the executor's.
+            blocking: Also offload an `async def` tool that blocks internally. It runs
+                in its own event loop on a worker thread.
+            cache_ttl: Cache results for this many seconds. Off by default.
+            cache_key: Builds the cache key from the tool's arguments (passed by
+                keyword, without the run context). Defaults to all of them.
+            context_fields: Fields of the run context that are part of the key, e.g.
+                `("uid",)` for a per-user tool.
+            cache_size: Most results kept per tool.
+        """
+
+        def decorator(func: Callable[..., Any]) -> FunctionTool:
+            name = function_tool_kwargs.get("name_override") or func.__name__
+            limit = timeout if timeout is not None else self.default_timeout
+            histogram = self.histograms.setdefault(name, LatencyHistogram())
+            is_async = inspect.iscoroutinefunction(func)
+            signature = inspect.signature(func)
+            cache = None
+            if cache_ttl is not None:
+                cache = self.caches.setdefault(name, ToolCache(cache_size))
+
+            async def execute(args: tuple[Any, ...], kwargs: dict[str, Any]) -> Any:
+                if is_async and not blocking:
+                    call = func(*args, **kwargs)
+                elif is_async:
+                    target = functools.partial(asyncio.run, func(*args, **kwargs))
+                    call = asyncio.get_running_loop().run_in_executor(self._pool, target)
+                else:
+                    target = functools.partial(func, *args, **kwargs)
+                    call = asyncio.get_running_loop().run_in_executor(self._pool, target)
+                start = perf_counter()
+                try:
+                    return await asyncio.wait_for(call, limit)
+                except asyncio.TimeoutError:
+                    histogram.timeouts += 1
+                    raise TimeoutError(f"Tool {name} timed out after {limit}s") from None
+                except Exception:
+                    histogram.errors += 1
+                    raise
+                finally:
+                    histogram.observe((perf_counter() - start) * 1000)
+
+            @functools.wraps(func)
+            async def wrapper(*args: Any, **kwargs: Any) -> Any:
+                if cache is None:
+                    return await execute(args, kwargs)
+                arguments = signature.bind(*args, **kwargs).arguments
+                ctx = None
+                for param, value in list(arguments.items()):
+                    if isinstance(value, RunContextWrapper):
+                        ctx = arguments.pop(param)
+                key = ((cache_key or default_key)(**arguments), context_values(ctx, context_fields))
+                return await cache.get_or_call(key, cache_ttl, lambda: execute(args, kwargs))
+
+            return function_tool(wrapper, **function_tool_kwargs)
+
+        if func is not None:
+            return decorator(func)
+        return decorator
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        stats = {name: histogram.summary() for name, histogram in self.histograms.items()}
+        for name, cache in self.caches.items():
+            stats[name]["cache"] = cache.stats()
+        return stats
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+executor = ToolExecutor()